@@ -6,15 +6,21 @@ import configparser
 import csv
 import requests
 import pandas as pd
+import sys
 from pathlib import Path
 
+# Import steam_stats from this checkout when it isn't installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from steam_stats.cache import DEFAULT_CACHE_PATH, MetadataCache, cached
+from steam_stats.player import get_owned_games
+
 logger = logging.getLogger()
 temps_debut = time.time()
 
 
-def get_all_ids(api_key):
+def get_all_ids(s, api_key, cache=None):
     url = f"http://api.steampowered.com/ISteamApps/GetAppList/v0002/?key={api_key}&format=json"
-    json_dict = requests.get(url).json()
+    json_dict = cached(cache, "app_list", lambda: s.get(url).json())
     logger.debug(f"get_all_ids JSON output: {json_dict}")
     dict_games = []
     for game in json_dict["applist"]["apps"]:
@@ -22,21 +28,20 @@ def get_all_ids(api_key):
     return dict_games
 
 
-def get_owned_ids(api_key, user_id):
-    url = f"http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/?key={api_key}&steamid={user_id}&format=json&include_played_free_games=1"
-    json_dict = requests.get(url).json()
-    logger.debug(f"get_owned_ids JSON output: {json_dict}")
+def get_owned_ids(s, api_key, user_id, cache=None):
+    games = get_owned_games(s, api_key, user_id, cache)
+    logger.debug(f"get_owned_ids JSON output: {games}")
     dict_games = []
-    for game in json_dict["response"]["games"]:
+    for game in games:
         dict_games.append({"appid": game["appid"]})
     return dict_games
 
 
-def get_wishlist_ids(user_id):
+def get_wishlist_ids(s, user_id, cache=None):
     dict_games = []
     url = f"https://api.steampowered.com/IWishlistService/GetWishlist/v1/?steamid={user_id}"
     logger.info("Fetching page %s.", url)
-    json_dict = requests.get(url).json()
+    json_dict = cached(cache, "wishlist", lambda: s.get(url).json(), steamid=user_id)
     logger.debug(f"get_wishlist_ids JSON output: {json_dict}")
     if json_dict:
         for game_data in json_dict["response"]["items"]:
@@ -79,19 +84,26 @@ def main():
 
     Path("Exports").mkdir(parents=True, exist_ok=True)
 
+    s = requests.Session()
+    cache = (
+        MetadataCache(args.cache, max_age=args.cache_max_age * 3600)
+        if args.cache
+        else None
+    )
+
     if args.type == "all":
         logger.debug("Type : all")
-        dict_games = get_all_ids(api_key)
+        dict_games = get_all_ids(s, api_key, cache)
     elif args.type == "owned":
         logger.debug("Type : owned")
-        dict_games = get_owned_ids(api_key, user_id)
+        dict_games = get_owned_ids(s, api_key, user_id, cache)
     elif args.type == "wishlist":
         logger.debug("Type : wishlist")
-        dict_games = get_wishlist_ids(user_id)
+        dict_games = get_wishlist_ids(s, user_id, cache)
     elif args.type == "both":
         logger.debug("Type : both")
-        dict_games = get_owned_ids(api_key, user_id)
-        dict_games += get_wishlist_ids(user_id)
+        dict_games = get_owned_ids(s, api_key, user_id, cache)
+        dict_games += get_wishlist_ids(s, user_id, cache)
 
     df = pd.DataFrame(dict_games)
     filename = (
@@ -131,6 +143,22 @@ def parse_args():
         help="Override export filename.",
         type=str,
     )
+    parser.add_argument(
+        "--cache",
+        help=(
+            "Reuse and store data in the local cache shared with steam_stats "
+            f"(default path: {DEFAULT_CACHE_PATH})"
+        ),
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--cache_max_age",
+        help="Maximum age in hours of the cached data used (default: 12)",
+        type=float,
+        default=12,
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=args.loglevel)
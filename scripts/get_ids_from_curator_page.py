@@ -5,6 +5,8 @@ import csv
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
 from pathlib import Path
 
 logger = logging.getLogger()
@@ -39,17 +41,94 @@ def get_curator_ids(soup):
     return list_items
 
 
+def get_curator_ids_from_file(filename: str):
+    """
+    Stream a saved curator page with lxml and extract the appids linked from
+    `#RecommendationsRows .recommendation`, without building the whole tree.
+    """
+    list_items = []
+    depth = 0
+    rows_depth = None
+    recommendation_depth = None
+    for event, element in etree.iterparse(
+        filename, events=("start", "end"), html=True, huge_tree=True
+    ):
+        if event == "start":
+            depth += 1
+            if element.tag == "div" and element.get("id") == "RecommendationsRows":
+                rows_depth = depth
+            elif (
+                element.tag == "div"
+                and rows_depth is not None
+                and "recommendation" in (element.get("class") or "").split()
+            ):
+                recommendation_depth = depth
+            elif element.tag == "a" and recommendation_depth is not None:
+                link = element.get("href")
+                if link:
+                    try:
+                        list_items.append({"appid": get_id_from_link(link)})
+                        # Only the first link of a recommendation points to the game.
+                        recommendation_depth = None
+                    except IndexError:
+                        logger.warning("Couldn't extract game ID from link %s", link)
+            continue
+
+        if depth == recommendation_depth:
+            recommendation_depth = None
+        if depth == rows_depth:
+            rows_depth = None
+        depth -= 1
+        # Free the elements already parsed to keep memory flat on huge pages.
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    return list_items
+
+
+def get_curator_ids_with_soup(filename: str):
+    return get_curator_ids(read_soup_from_fs(filename))
+
+
+def list_html_files(paths: list[str]) -> list[str]:
+    filenames = []
+    for path in paths:
+        if Path(path).is_dir():
+            filenames += sorted(
+                str(x) for x in Path(path).iterdir() if x.suffix in [".html", ".htm"]
+            )
+        elif Path(path).is_file():
+            filenames.append(path)
+        else:
+            raise FileNotFoundError("%s is not a valid file or directory.", path)
+    return filenames
+
+
 def main():
     args = parse_args()
 
-    logger.debug("Reading HTML file")
-    soup = read_soup_from_fs(args.filename)
-    dict_games = get_curator_ids(soup)
+    filenames = list_html_files(args.filename)
+    logger.debug("Reading %d HTML files", len(filenames))
+    parse_file = (
+        get_curator_ids_from_file
+        if args.parser == "lxml"
+        else get_curator_ids_with_soup
+    )
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(parse_file, filenames))
+
+    # Several pages of the same curator can overlap, keep the first occurrence.
+    appids = {}
+    for filename, list_items in zip(filenames, results):
+        logger.info("%s: %d games", filename, len(list_items))
+        for item in list_items:
+            appids.setdefault(item["appid"], item)
+    dict_games = list(appids.values())
 
     Path("Exports").mkdir(parents=True, exist_ok=True)
 
     df = pd.DataFrame(dict_games)
-    filename = f"Exports/ids_curators_{start_time}.csv"
+    filename = args.output if args.output else f"Exports/ids_curators_{start_time}.csv"
     df.to_csv(filename, sep="\t", index=False, quoting=csv.QUOTE_MINIMAL)
     logger.info(f"Output file: {filename}.")
 
@@ -71,9 +150,28 @@ def parse_args():
     parser.add_argument(
         "-f",
         "--filename",
-        help="File containing html data for curator",
+        help="Files or directories containing html data for curators",
+        type=str,
+        nargs="+",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Override export filename.",
         type=str,
     )
+    parser.add_argument(
+        "--parser",
+        help="HTML parser: lxml (streaming, default) or html.parser (BeautifulSoup)",
+        choices=["lxml", "html.parser"],
+        default="lxml",
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of files parsed in parallel (default: number of CPUs)",
+        type=int,
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=args.loglevel)
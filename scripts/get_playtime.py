@@ -6,18 +6,26 @@ import configparser
 import csv
 import requests
 import pandas as pd
+import sys
 from pathlib import Path
 
+# Import steam_stats from this checkout when it isn't installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from steam_stats.cache import DEFAULT_CACHE_PATH, MetadataCache, cached
+from steam_stats.player import get_owned_games
+
 logger = logging.getLogger()
 temps_debut = time.time()
 
 
-def get_playtime_recent(api_key, user_id):
+def get_playtime_recent(s, api_key, user_id, cache=None):
     url_recent = (
         "https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v1/"
         f"?key={api_key}&steamid={user_id}"
     )
-    json_dict_recent = requests.get(url_recent).json()
+    json_dict_recent = cached(
+        cache, "recently_played", lambda: s.get(url_recent).json(), steamid=user_id
+    )
     games_list_recent = []
     for game in json_dict_recent["response"]["games"]:
         games_list_recent.append(
@@ -29,14 +37,9 @@ def get_playtime_recent(api_key, user_id):
     return games_list_recent
 
 
-def get_playtime(api_key, user_id):
-    url = (
-        "http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/"
-        f"?key={api_key}&steamid={user_id}&format=json&include_played_free_games=1"
-    )
-    json_dict = requests.get(url).json()
+def get_playtime(s, api_key, user_id, cache=None):
     games_list = []
-    for game in json_dict["response"]["games"]:
+    for game in get_owned_games(s, api_key, user_id, cache):
         games_list.append(
             {
                 "appid": game["appid"],
@@ -80,8 +83,14 @@ def main():
 
     Path("Exports").mkdir(parents=True, exist_ok=True)
 
-    dict_games = get_playtime(api_key, user_id)
-    dict_games_recent = get_playtime_recent(api_key, user_id)
+    s = requests.Session()
+    cache = (
+        MetadataCache(args.cache, max_age=args.cache_max_age * 3600)
+        if args.cache
+        else None
+    )
+    dict_games = get_playtime(s, api_key, user_id, cache)
+    dict_games_recent = get_playtime_recent(s, api_key, user_id, cache)
 
     df = pd.DataFrame(dict_games)
     df_recent = pd.DataFrame(dict_games_recent)
@@ -118,6 +127,22 @@ def parse_args():
         help="Override export filename.",
         type=str,
     )
+    parser.add_argument(
+        "--cache",
+        help=(
+            "Reuse and store data in the local cache shared with steam_stats "
+            f"(default path: {DEFAULT_CACHE_PATH})"
+        ),
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--cache_max_age",
+        help="Maximum age in hours of the cached data used (default: 12)",
+        type=float,
+        default=12,
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=args.loglevel)
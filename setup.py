@@ -29,4 +29,9 @@ setuptools.setup(
         "urllib3",
         "openpyxl",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "zstd": ["zstandard"],
+        "benchmark": ["pytest", "pytest-benchmark"],
+    },
 )
@@ -1,10 +1,9 @@
 import logging
+import os
 import time
 import argparse
+import contextlib
 import datetime
-import json
-import urllib.parse
-import csv
 from typing import Any
 import pandas as pd
 import requests
@@ -13,23 +12,64 @@ from requests.adapters import HTTPAdapter
 from pathlib import Path
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cache import DEFAULT_CACHE_PATH, MetadataCache
 from .config import SteamConfig
-from .itad import get_itad_data
-from .requests import get_steam_json
+from .dataset import DatasetStore, latest_export
+from .export import (
+    PARTITION_COLUMNS,
+    PartitionedWriter,
+    TsvWriter,
+    partition_directory,
+    prepare_games,
+    read_export,
+)
+from .inverted_index import InvertedIndexBuilder, index_filename
+from .itad import ITAD_COLUMNS, get_itad_data
+from .keys import DEFAULT_DAILY_BUDGET, KeyPool
+from .pipeline import (
+    BatchPrefetcher,
+    batched,
+    expand_inputs,
+    read_all_appids,
+    unique,
+)
+from .prices import PRICE_COLUMNS, get_price_rows, parse_regions
+from .profiling import profiled, span, start_profiling, stop_profiling
+from .recorder import RecordingSession, ReplaySession
+from .requests import configure_http, get_steam_json
+from .reviews import (
+    DEFAULT_STATE_PATH,
+    ReviewsHarvester,
+    ReviewsWriter,
+    default_reviews_filename,
+)
+from .scheduler import (
+    load_state,
+    record_failures,
+    save_state,
+    select_due_appids,
+    update_state,
+)
+from .server import Daemon, serve_api
+from .store import get_games_batch
 
 logger = logging.getLogger()
 logging.getLogger("requests").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
-START_TIME = time.time()
 BATCH_SIZE = 200  # Optimized request allows 200 games per batch
 
 
-def get_achievements_dict(s, api_key, user_id, app_id):
+def get_achievements_dict(s, api_keys: KeyPool, user_id, app_id):
     url_achievements = (
         "https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v0001/"
-        f"?appid={app_id}&key={api_key}&steamid={user_id}"
+        f"?appid={app_id}&key={{key}}&steamid={user_id}"
     )
-    result = get_steam_json(s, url_achievements, app_id)
+    result = get_steam_json(s, url_achievements, app_id, keys=api_keys)
+    return parse_achievements(app_id, result)
+
+
+def parse_achievements(app_id, result: dict) -> dict:
+    """Count the achievements of a GetPlayerAchievements answer."""
     if "error" in result["playerstats"].keys():
         if result["playerstats"]["error"] == "Requested app has no stats":
             return {}
@@ -71,74 +111,20 @@ def get_data_dict(s, game_id: str) -> dict[str, Any]:
         return {}
 
 
-def get_games_batch(s, appids: list[str]) -> dict[str, dict]:
-    """
-    Fetch game details for multiple games using IStoreBrowseService/GetItems API.
-    Returns a dict mapping appid -> game data.
-
-    Note: Only requests essential fields to keep URL length manageable.
-    """
-    request_json = {
-        "ids": [{"appid": int(appid)} for appid in appids],
-        "context": {"language": "english", "country_code": "US", "steam_realm": 1},
-        "data_request": {
-            "include_release": True,
-            "include_platforms": True,
-            "include_basic_info": True,
-            "include_tag_count": 20,
-            "include_reviews": True,
-        },
-    }
-
-    encoded_json_string = urllib.parse.quote(json.dumps(request_json))
-    url = f"https://api.steampowered.com/IStoreBrowseService/GetItems/v1?input_json={encoded_json_string}"
-
-    try:
-        result = s.get(url)
-        result.raise_for_status()
-        data = result.json()
-
-        # Build a dict mapping appid -> store_item
-        games_dict = {}
-        if "response" in data and "store_items" in data["response"]:
-            for store_item in data["response"]["store_items"]:
-                appid = str(store_item.get("appid", ""))
-                if appid:
-                    games_dict[appid] = store_item
-
-        return games_dict
-    except Exception as e:
-        logger.error("Error fetching batch of games: %s", e)
-        return {}
-
-
 def extract_game_data_from_store_item(store_item: dict) -> dict:
     """
     Extract game data from the new API format (IStoreBrowseService/GetItems).
     Maps fields from the new API to the format expected by the rest of the code.
     """
-    import datetime
-
     # Map numeric type to string (0 = game, 1 = dlc, 2 = demo, etc.)
     type_map = {0: "game", 1: "dlc", 2: "demo", 3: "mod", 4: "video"}
     numeric_type = store_item.get("type", 0)
     type_str = type_map.get(numeric_type, "game")
 
-    # Convert Unix timestamp to formatted date string
+    # Keep the raw Unix timestamp, dates are formatted for all games at write time
     release_timestamp = store_item.get("release", {}).get("steam_release_date", 0)
-    if (
-        release_timestamp
-        and isinstance(release_timestamp, int)
-        and release_timestamp > 0
-    ):
-        try:
-            release_date_formatted = datetime.datetime.fromtimestamp(
-                release_timestamp
-            ).strftime("%b %d, %Y")
-        except (ValueError, OSError):
-            release_date_formatted = ""
-    else:
-        release_date_formatted = ""
+    if not isinstance(release_timestamp, int) or release_timestamp <= 0:
+        release_timestamp = None
 
     # Extract developers and publishers in the expected format
     developers_list = [
@@ -175,7 +161,7 @@ def extract_game_data_from_store_item(store_item: dict) -> dict:
             "mac": store_item.get("platforms", {}).get("mac", False),
         },
         "genres": genres_list,
-        "release_date": {"date": release_date_formatted},
+        "release_date": {"timestamp": release_timestamp},
     }
 
 
@@ -189,9 +175,20 @@ def get_reviews_dict(s, game_id):
 
 
 def process_single_game(
-    s, game_id, games_data, api_key, user_id, export_time, export_extra_data, config
+    s,
+    game_id,
+    games_data,
+    api_keys,
+    user_id,
+    export_time,
+    achievements=None,
 ):
-    """Process a single game and return its data dict, or None if processing fails."""
+    """
+    Process a single game and return its data dict, or None if processing fails.
+
+    achievements maps the appids of the batch to their cached achievements, the
+    ones fetched here are added to it to be cached with the whole batch.
+    """
     game_id = str(game_id)
 
     # Get game data from the batch result, or fall back to old API
@@ -203,8 +200,10 @@ def process_single_game(
         # For old API, reviews need to be fetched separately
         reviews_dict = get_reviews_dict(s, game_id)
     else:
-        store_item = games_data[game_id]
-        data_dict = extract_game_data_from_store_item(store_item)
+        # Release the raw store item as soon as it is extracted
+        store_item = games_data.pop(game_id)
+        with span("extract"):
+            data_dict = extract_game_data_from_store_item(store_item)
 
         # Get reviews from the new API response
         reviews_summary = store_item.get("reviews", {}).get("summary_filtered", {})
@@ -213,25 +212,15 @@ def process_single_game(
         if not reviews_summary or not reviews_summary.get("review_count"):
             reviews_dict = get_reviews_dict(s, game_id)
         else:
-            # Use reviews from the new API
+            # Use reviews from the new API. It provides percent_positive
+            # instead of raw counts, they are derived in add_derived_metrics.
             review_count = reviews_summary.get("review_count", 0)
-            percent_positive = reviews_summary.get("percent_positive", 0)
-
-            # Calculate positive/negative counts from percentage
-            # The new API provides percent_positive instead of raw counts
-            if review_count and percent_positive:
-                total_positive = int((percent_positive / 100) * review_count)
-                total_negative = review_count - total_positive
-            else:
-                total_positive = 0
-                total_negative = 0
-
             reviews_dict = {
                 "num_reviews": review_count,
-                "review_score": percent_positive,
+                "review_score": reviews_summary.get("percent_positive", 0),
                 "review_score_desc": reviews_summary.get("review_score_label", ""),
-                "total_positive": total_positive,
-                "total_negative": total_negative,
+                "total_positive": None,
+                "total_negative": None,
                 "total_reviews": review_count,
             }
 
@@ -239,15 +228,12 @@ def process_single_game(
         logger.warning("No name found for game %s, skipping", game_id)
         return None
 
-    achievements_dict = get_achievements_dict(s, api_key, user_id, game_id)
-
-    # Calculate achievement percentage
-    achieved = achievements_dict.get("achieved")
-    total_achievements = achievements_dict.get("total_achievements")
-    if achieved is not None and total_achievements and total_achievements > 0:
-        achievement_percentage = round((achieved / total_achievements) * 100, 1)
-    else:
-        achievement_percentage = None
+    achievements_dict = achievements.get(game_id) if achievements else None
+    if achievements_dict is None:
+        with span("achievements"):
+            achievements_dict = get_achievements_dict(s, api_keys, user_id, game_id)
+        if achievements is not None:
+            achievements[game_id] = achievements_dict
 
     game_dict = {
         "export_date": export_time,
@@ -266,7 +252,9 @@ def process_single_game(
         "linux": data_dict["platforms"]["linux"],
         "mac": data_dict["platforms"]["mac"],
         "genres": ", ".join([x["description"] for x in data_dict.get("genres", [])]),
-        "release_date": data_dict["release_date"]["date"],
+        # Only the legacy API gives a date string instead of a timestamp
+        "release_timestamp": data_dict["release_date"].get("timestamp"),
+        "release_date": data_dict["release_date"].get("date"),
         "num_reviews": reviews_dict.get("num_reviews"),
         "review_score": reviews_dict.get("review_score"),
         "review_score_desc": reviews_dict.get("review_score_desc"),
@@ -274,119 +262,395 @@ def process_single_game(
         "total_negative": reviews_dict.get("total_negative"),
         "total_reviews": reviews_dict.get("total_reviews"),
         "url": f"https://store.steampowered.com/app/{game_id}",
-        "achieved_achievements": achieved,
-        "total_achievements": total_achievements,
-        "achievement_percentage": achievement_percentage,
+        "achieved_achievements": achievements_dict.get("achieved"),
+        "total_achievements": achievements_dict.get("total_achievements"),
+        # Computed for all games at once in add_derived_metrics
+        "achievement_percentage": None,
     }
 
-    if export_extra_data:
-        itad_api_key = config.get_itad_api_key()
-        result_itad = get_itad_data(s, itad_api_key, game_id)
-        if result_itad:
-            game_dict = {**game_dict, **result_itad}
-
     logger.debug("Result for game %s: %s.", game_id, game_dict)
     return game_dict
 
 
-# Config reading is now handled by the SteamConfig class in config.py
+def fetch_itad_data(s, itad_api_keys: KeyPool, game_id) -> dict:
+    with span("itad"):
+        return get_itad_data(s, itad_api_keys, game_id)
 
 
-def main():
-    args = parse_args()
-    export_date = datetime.datetime.now().strftime("%Y-%m-%d")
-    export_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+def merge_itad_data(game_dict_list, itad_futures):
+    """Add the ITAD data fetched for each game, waiting for the missing ones."""
+    for game_dict in game_dict_list:
+        future = itad_futures.get(game_dict["appid"])
+        if future is None:
+            continue
+        try:
+            with span("itad_wait"):
+                result_itad = future.result()
+        except Exception as e:
+            logger.error("Error fetching ITAD data of %s: %s", game_dict["appid"], e)
+            continue
+        if result_itad:
+            game_dict.update(result_itad)
 
-    if not args.file:
-        raise ValueError("-f/--file argument not filled. Exiting.")
-    if not Path(args.file).is_file():
-        raise FileNotFoundError("%s is not a file. Exiting.", args.file)
 
-    config = SteamConfig()
-    api_key = config.get_api_key()
-    user_id = config.get_user_id()
+# Config reading is now handled by the SteamConfig class in config.py
 
-    logger.debug("Reading CSV file")
-    df = pd.read_csv(args.file, sep="\t")
-    logger.debug("Columns : %s", df.columns)
 
-    ids = df.appid.tolist()
-    Path("Exports").mkdir(parents=True, exist_ok=True)
+def carry_forward(previous: str, appids: set[str], writer, index_builder) -> int:
+    """
+    Copy the rows of appids from a previous export, so that a scheduled run
+    still writes every game and not only the ones it refreshed.
+    """
+    carried = 0
+    for chunk in read_export(previous):
+        chunk = chunk[chunk["appid"].isin(appids)]
+        writer.write(chunk)
+        index_builder.add(chunk.to_dict("records"))
+        carried += len(chunk)
+    return carried
+
 
+def create_session():
     s = requests.Session()
     retries = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
     s.mount("http://", HTTPAdapter(max_retries=retries))
     s.mount("https://", HTTPAdapter(max_retries=retries))
+    return s
 
-    game_dict_list = []
-
-    # Split IDs into batches for the new API
-    batches = [ids[i : i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
-    logger.info("Processing %d games in %d batches", len(ids), len(batches))
-
-    for batch in tqdm(batches, desc="Batches", dynamic_ncols=True):
-        # Fetch batch of games using the new API
-        games_data = get_games_batch(s, batch)
-
-        # Process each game in the batch using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=args.workers) as executor:
-            # Submit all tasks
-            future_to_game = {
-                executor.submit(
-                    process_single_game,
-                    s,
-                    game_id,
-                    games_data,
-                    api_key,
-                    user_id,
-                    export_time,
-                    args.export_extra_data,
-                    config,
-                ): game_id
-                for game_id in batch
-            }
 
-            # Collect results as they complete with progress bar
-            for future in tqdm(
-                as_completed(future_to_game),
-                total=len(batch),
-                desc="Games in batch",
-                leave=False,
-                dynamic_ncols=True,
-            ):
-                try:
-                    game_dict = future.result()
-                    if game_dict:
-                        game_dict_list.append(game_dict)
-                except Exception as e:
-                    game_id = future_to_game[future]
-                    logger.error("Error processing game %s: %s", game_id, e)
-
-    df = pd.DataFrame(game_dict_list)
-    df = df.astype(
-        {
-            "achieved_achievements": "Int64",
-            "total_achievements": "Int64",
-            "total_positive": "Int64",
-            "total_negative": "Int64",
-            "total_reviews": "Int64",
-        }
+def run_export(args, s, config, api_keys, user_id, cache=None, stop=None) -> str:
+    """
+    Run a complete export of the games listed in args.file and return its
+    filename, or directory with --partition_by. When the stop event is set, the export ends after the current
+    batch, keeping the previous rows of the games left in scheduled runs.
+    """
+    start_time = time.time()
+    export_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    export_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    # Inputs such as `get_ids.py -t both` often repeat appids, keep the first one.
+    ids = unique(read_all_appids(expand_inputs(args.file)))
+    if args.schedule:
+        schedule_state = load_state(args.schedule)
+        all_ids = list(ids)
+        ids = select_due_appids(all_ids, schedule_state, args.budget)
+    Path("Exports").mkdir(parents=True, exist_ok=True)
+
+    regions = parse_regions(args.regions) if args.regions else []
+    itad_api_keys = (
+        KeyPool(config.get_itad_api_keys(), args.key_budget)
+        if args.export_extra_data
+        else None
     )
+    # ITAD is queried in its own workers, concurrently with the Steam requests
+    # of the same batch, and joined back into the rows before writing.
+    itad_pool = (
+        ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="itad")
+        if itad_api_keys is not None
+        else contextlib.nullcontext()
+    )
+    itad_executor = None  # Bound by the with block running the batches
+
+    def submit_itad(appids) -> dict:
+        if itad_executor is None or itad_api_keys is None:
+            return {}
+        return {
+            appid: itad_executor.submit(fetch_itad_data, s, itad_api_keys, appid)
+            for appid in appids
+        }
+
+    def fetch_batch(batch):
+        # Fetch batch of games using the new API, except the ones already cached.
+        # Scheduled runs only pick games due for a refresh, fetched again.
+        games_data = (
+            cache.get_many("store_item", batch) if cache and not args.schedule else {}
+        )
+        missing = [game_id for game_id in batch if game_id not in games_data]
+        if missing:
+            with span("fetch_batch"):
+                fetched = get_games_batch(s, missing)
+            if cache:
+                cache.put_many("store_item", fetched)
+            games_data.update(fetched)
+        achievements = (
+            cache.get_many("achievements", batch, steamid=user_id) if cache else {}
+        )
+        # Only the games found on the store are looked up on ITAD
+        itad_futures = submit_itad(
+            appid for appid, store_item in games_data.items() if store_item.get("name")
+        )
+        price_rows = []
+        if regions:
+            try:
+                with span("fetch_prices"):
+                    # ITAD prices of every region come with the extra data
+                    price_rows = get_price_rows(s, batch, regions, itad_api_keys)
+            except Exception as e:
+                logger.error("Error fetching prices of batch: %s", e)
+        return games_data, achievements, price_rows, itad_futures
 
     filename = (
         args.export_filename
         if args.export_filename
         else f"Exports/game_info_{export_date}.csv"
     )
-    logger.debug("Writing complete export %s.", filename)
-    df.to_csv(filename, sep="\t", index=False, quoting=csv.QUOTE_MINIMAL)
-    logger.info("Runtime : %.2f seconds" % (time.time() - START_TIME))
+    writer = (
+        PartitionedWriter(filename, args.partition_by)
+        if args.partition_by
+        else TsvWriter(filename)
+    )
+    prices_writer = TsvWriter(
+        args.prices_filename
+        if args.prices_filename
+        else f"Exports/prices_{export_date}.csv",
+        columns=["export_date", *PRICE_COLUMNS],
+    )
+    # Partitioned exports are read back from their directory
+    output = writer.directory if isinstance(writer, PartitionedWriter) else filename
+    index_builder = InvertedIndexBuilder()
+    # Games not due in a scheduled run keep their rows of the previous export.
+    previous = (
+        output
+        if args.export_filename and Path(output).exists()
+        else latest_export(str(Path(filename).parent))
+    )
+    refreshed: set[str] = set()
+    extra_columns = ITAD_COLUMNS if args.export_extra_data else []
+    max_memory = args.max_memory * 2**20 if args.max_memory else None
+
+    # Split IDs into batches for the new API, the next batch being fetched
+    # while the current one is processed and written.
+    batches = BatchPrefetcher(
+        batched(ids, BATCH_SIZE),
+        fetch_batch,
+        prefetch=1 if max_memory else 2,
+        max_memory=max_memory,
+    )
+    try:
+        with itad_pool as itad_executor, batches:
+            for batch, (games_data, achievements, price_rows, itad_futures) in tqdm(
+                batches, desc="Batches", dynamic_ncols=True
+            ):
+                if stop is not None and stop.is_set():
+                    if not args.schedule:
+                        raise InterruptedError("Export stopped before its end")
+                    logger.warning(
+                        "Stopping export, remaining games are kept as they were"
+                    )
+                    break
+                game_dict_list = []
+                cached_appids = set(achievements)
+                # Process each game in the batch using ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                    # Submit all tasks
+                    future_to_game = {
+                        executor.submit(
+                            profiled(process_single_game, "process_game"),
+                            s,
+                            game_id,
+                            games_data,
+                            api_keys,
+                            user_id,
+                            export_time,
+                            achievements,
+                        ): game_id
+                        for game_id in batch
+                    }
+
+                    # Collect results as they complete with progress bar
+                    for future in tqdm(
+                        as_completed(future_to_game),
+                        total=len(batch),
+                        desc="Games in batch",
+                        leave=False,
+                        dynamic_ncols=True,
+                    ):
+                        try:
+                            game_dict = future.result()
+                            if game_dict:
+                                game_dict_list.append(game_dict)
+                        except Exception as e:
+                            game_id = future_to_game[future]
+                            logger.error("Error processing game %s: %s", game_id, e)
+
+                # One commit for the achievements fetched in the whole batch
+                fetched_achievements = {
+                    appid: achievements_dict
+                    for appid, achievements_dict in achievements.items()
+                    if appid not in cached_appids
+                }
+                if cache and fetched_achievements:
+                    cache.put_many(
+                        "achievements", fetched_achievements, steamid=user_id
+                    )
+                # Games only found through the legacy API are looked up now
+                itad_futures.update(
+                    submit_itad(
+                        game_dict["appid"]
+                        for game_dict in game_dict_list
+                        if game_dict["appid"] not in itad_futures
+                    )
+                )
+                merge_itad_data(game_dict_list, itad_futures)
+                if args.schedule:
+                    update_state(schedule_state, game_dict_list)
+                    # Removed or unknown apps would otherwise stay due forever
+                    succeeded = {game_dict["appid"] for game_dict in game_dict_list}
+                    record_failures(
+                        schedule_state,
+                        [appid for appid in batch if str(appid) not in succeeded],
+                    )
+                index_builder.add(game_dict_list)
+                refreshed.update(game_dict["appid"] for game_dict in game_dict_list)
+                # Whole batches of removed or unknown apps give no game to write.
+                if game_dict_list:
+                    logger.debug("Writing %d games to %s.", len(game_dict_list), output)
+                    with span("prepare"):
+                        df = prepare_games(game_dict_list, export_time, extra_columns)
+                    with span("write"):
+                        writer.write(df)
+                if price_rows:
+                    df_prices = pd.DataFrame(price_rows)
+                    df_prices.insert(0, "export_date", export_time)
+                    with span("write"):
+                        prices_writer.write(df_prices)
+
+        if args.schedule and previous:
+            carried = carry_forward(
+                previous, set(all_ids) - refreshed, writer, index_builder
+            )
+            logger.info("Kept %d games not due for refresh from %s", carried, previous)
+        elif args.schedule:
+            logger.warning(
+                "No previous export found, %s only holds the games refreshed", output
+            )
+        writer.close()
+        if regions:
+            prices_writer.close()
+        if args.schedule:
+            save_state(args.schedule, schedule_state)
+    except BaseException:
+        # Keep the previous export rather than publishing a partial one.
+        writer.abort()
+        prices_writer.abort()
+        raise
+
+    with span("index"):
+        index_builder.build().save(index_filename(output))
+    logger.info("Exported %d games to %s", writer.rows, output)
+    logger.info("Runtime : %.2f seconds" % (time.time() - start_time))
+    return output
+
+
+def run_reviews_harvest(args, s):
+    """Harvest the individual reviews of the games listed in args.file."""
+    start_time = time.time()
+    export_date = datetime.datetime.now().strftime("%Y-%m-%d")
+    ids = unique(read_all_appids(expand_inputs(args.file)))
+    Path("Exports").mkdir(parents=True, exist_ok=True)
+    writer = ReviewsWriter(
+        args.export_filename
+        if args.export_filename
+        else default_reviews_filename(export_date)
+    )
+    harvester = ReviewsHarvester(s, writer, args.reviews_state, args.max_pages)
+    harvester.run(ids, workers=args.workers)
+    logger.info("Runtime : %.2f seconds" % (time.time() - start_time))
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "api":
+        store = DatasetStore()
+        filename = args.export_filename or latest_export()
+        if args.export_filename and args.partition_by:
+            filename = partition_directory(args.export_filename)
+        if not filename:
+            raise FileNotFoundError("No export found in Exports. Exiting.")
+        store.load(filename)
+        serve_api(store, args.host, args.port)
+        return
+
+    if not args.file:
+        raise ValueError("-f/--file argument not filled. Exiting.")
+    expand_inputs(args.file)
+    if args.command == "serve" and "-" in args.file:
+        raise ValueError("stdin can't be read again at every cycle in serve mode.")
+
+    if args.replay:
+        # Keys and user id are redacted from recorded URLs, any value works.
+        for variable in ["STEAM_API_KEY", "STEAM_USER_ID", "ITAD_API_KEY"]:
+            os.environ.setdefault(variable, "REPLAY")
+        s = ReplaySession(args.replay)
+    elif args.record:
+        s = RecordingSession(create_session(), args.record)
+    else:
+        s = create_session()
+
+    if args.command == "reviews":
+        try:
+            run_reviews_harvest(args, s)
+        finally:
+            s.close()
+        return
+
+    config = SteamConfig()
+    api_keys = KeyPool(config.get_api_keys(), args.key_budget)
+    user_id = config.get_user_id()
+    configure_http(config.get_timeouts(), hedge=args.hedge)
+    cache = (
+        MetadataCache(args.cache, max_age=args.cache_max_age * 3600)
+        if args.cache
+        else None
+    )
+
+    if args.command == "serve":
+        store = DatasetStore()
+        filename = latest_export()
+        if filename:
+            store.load(filename)
+        daemon = Daemon(
+            lambda stop: run_export(args, s, config, api_keys, user_id, cache, stop),
+            interval=args.interval,
+            host=args.host,
+            port=args.port,
+            store=store,
+        )
+        try:
+            daemon.run()
+        finally:
+            s.close()
+            if cache:
+                cache.close()
+    else:
+        if args.profile:
+            start_profiling(args.profile)
+        try:
+            run_export(args, s, config, api_keys, user_id, cache)
+        finally:
+            stop_profiling()
+            s.close()
+            if cache:
+                cache.close()
 
 
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Export Steam games data from a list of appids"
     )
+    parser.add_argument(
+        "command",
+        help=(
+            "run: export once and exit (default). "
+            "serve: keep running and export every --interval seconds. "
+            "api: serve the latest export (or --export_filename) over HTTP. "
+            "reviews: harvest the individual reviews of the games"
+        ),
+        nargs="?",
+        choices=["run", "serve", "api", "reviews"],
+        default="run",
+    )
     parser.add_argument(
         "--debug",
         help="Display debugging information",
@@ -396,21 +660,173 @@ def parse_args():
         default=logging.INFO,
     )
     parser.add_argument(
-        "-f", "--file", help="File containing the appids to parse", type=str
+        "-f",
+        "--file",
+        help=(
+            "Files containing the appids to parse (globs accepted, - for stdin). "
+            "Can be repeated"
+        ),
+        type=str,
+        nargs="+",
+        action="extend",
+    )
+    parser.add_argument(
+        "--export_filename",
+        help=(
+            "Override export filename. Ending it with .gz or .zst compresses "
+            "the export with gzip or zstd"
+        ),
+        type=str,
+    )
+    parser.add_argument(
+        "--partition_by",
+        help=(
+            "Split the export into one file per game type or release year, in a "
+            "directory named after the export"
+        ),
+        choices=PARTITION_COLUMNS,
     )
-    parser.add_argument("--export_filename", help="Override export filename", type=str)
     parser.add_argument(
         "--export_extra_data",
         help="Enable extra data fetching (ITAD)",
         dest="export_extra_data",
         action="store_true",
     )
+    parser.add_argument(
+        "--regions",
+        help=(
+            "Comma-separated ITAD_REGION:COUNTRY pairs (e.g. eu1:FR,us:US,uk:GB) "
+            "to collect prices for, written to a separate price table. ITAD "
+            "prices are included with --export_extra_data"
+        ),
+        type=str,
+    )
+    parser.add_argument(
+        "--prices_filename", help="Override price table filename", type=str
+    )
+    parser.add_argument(
+        "--max-memory",
+        help=(
+            "Approximate memory cap in MB: fetching pauses while the process "
+            "uses more, until pending batches are written. The appids seen and "
+            "the inverted index still grow with the number of games"
+        ),
+        dest="max_memory",
+        type=int,
+    )
+    parser.add_argument(
+        "--record",
+        help="Record every HTTP exchange of the run to this archive (.jsonl.gz)",
+        type=str,
+    )
+    parser.add_argument(
+        "--replay",
+        help="Replay the HTTP exchanges of an archive made with --record, offline",
+        type=str,
+    )
+    parser.add_argument(
+        "--profile",
+        help=(
+            "Profile the run and write PREFIX.prof (cProfile), "
+            "PREFIX.collapsed.txt (sampled stacks for speedscope/flamegraph) and "
+            "PREFIX.stages.json (wall and CPU time per stage). "
+            "Default prefix: Exports/profile_<date>"
+        ),
+        nargs="?",
+        const=f"Exports/profile_{datetime.datetime.now():%Y-%m-%d_%H%M%S}",
+        metavar="PREFIX",
+    )
+    parser.add_argument(
+        "--hedge",
+        help=(
+            "Send a duplicate of requests slower than the 95th percentile of "
+            "their host and keep the first answer"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--cache",
+        help=(
+            "Reuse and store app metadata in a local cache shared with the "
+            f"scripts (default path: {DEFAULT_CACHE_PATH})"
+        ),
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--cache_max_age",
+        help="Maximum age in hours of the cached data used (default: 12)",
+        type=float,
+        default=12,
+    )
+    parser.add_argument(
+        "--key_budget",
+        help=(
+            "Maximum number of requests per API key and per day, keys over it are "
+            f"left out of rotation (default: {DEFAULT_DAILY_BUDGET})"
+        ),
+        type=int,
+        default=DEFAULT_DAILY_BUDGET,
+    )
+    parser.add_argument(
+        "--reviews_state",
+        help=(
+            "State file of the reviews harvest, holding the cursors and "
+            f"watermarks of each game (default: {DEFAULT_STATE_PATH})"
+        ),
+        type=str,
+        default=DEFAULT_STATE_PATH,
+    )
+    parser.add_argument(
+        "--max_pages",
+        help=(
+            "Maximum number of review pages fetched per game in a harvest, "
+            "the next harvest resumes where it stopped"
+        ),
+        type=int,
+    )
     parser.add_argument(
         "--workers",
         help="Number of concurrent workers for processing games (default: 10)",
         type=int,
         default=10,
     )
+    parser.add_argument(
+        "--schedule",
+        help=(
+            "State file for priority scheduling: only refresh games that are due, "
+            "volatile games more often than stable ones"
+        ),
+        type=str,
+    )
+    parser.add_argument(
+        "--budget",
+        help=(
+            "Maximum number of games refreshed per run with --schedule, each one "
+            "taking a few requests (default: 5000)"
+        ),
+        type=int,
+        default=5000,
+    )
+    parser.add_argument(
+        "--interval",
+        help="Seconds between two refresh cycles in serve mode (default: 86400)",
+        type=int,
+        default=86400,
+    )
+    parser.add_argument(
+        "--host",
+        help="Address of the HTTP endpoint in serve and api modes (default: 127.0.0.1)",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        help="Port of the HTTP endpoint in serve and api modes (default: 8765)",
+        type=int,
+        default=8765,
+    )
     parser.set_defaults(export_extra_data=False)
     args = parser.parse_args()
 
@@ -0,0 +1,93 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "Exports/cache.sqlite"
+DEFAULT_MAX_AGE = 12 * 60 * 60  # 12 hours
+
+
+class MetadataCache:
+    """
+    Local store of Steam data shared by steam_stats and the scripts.
+
+    Entries are keyed on a kind (e.g. "store_item", "owned_games"), an appid
+    and a steamID, either of them empty when not relevant, and remember when
+    they were fetched so readers can ask for data younger than max_age.
+    """
+
+    def __init__(
+        self, path: str = DEFAULT_CACHE_PATH, max_age: float = DEFAULT_MAX_AGE
+    ):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # Several entry points may use the cache at the same time.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "kind TEXT NOT NULL, appid TEXT NOT NULL, steamid TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (kind, appid, steamid))"
+        )
+        self._connection.commit()
+
+    def get(self, kind: str, appid="", steamid="", max_age: float | None = None):
+        """Return the cached data, or None if missing or older than max_age."""
+        return self.get_many(kind, [appid], steamid, max_age).get(str(appid))
+
+    def get_many(
+        self, kind: str, appids, steamid="", max_age: float | None = None
+    ) -> dict:
+        """Return the fresh cached data of several appids, as a dict appid -> data."""
+        appids = [str(appid) for appid in appids]
+        oldest = time.time() - (self.max_age if max_age is None else max_age)
+        results = {}
+        with self._lock:
+            # Stay under SQLite's limit on the number of query parameters.
+            for i in range(0, len(appids), 500):
+                chunk = appids[i : i + 500]
+                rows = self._connection.execute(
+                    "SELECT appid, data FROM entries WHERE kind = ? AND steamid = ? "
+                    f"AND fetched_at >= ? AND appid IN ({','.join('?' * len(chunk))})",
+                    [kind, str(steamid), oldest, *chunk],
+                ).fetchall()
+                results.update((appid, json.loads(data)) for appid, data in rows)
+        return results
+
+    def put(self, kind: str, data, appid="", steamid=""):
+        self.put_many(kind, {appid: data}, steamid)
+
+    def put_many(self, kind: str, items: dict, steamid=""):
+        """Store several entries of one kind, given as a dict appid -> data."""
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                [
+                    (kind, str(appid), str(steamid), now, json.dumps(data))
+                    for appid, data in items.items()
+                ],
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def cached(cache: MetadataCache | None, kind: str, fetch, appid="", steamid=""):
+    """Return the fresh cached data if any, otherwise fetch() it and cache it."""
+    if cache is None:
+        return fetch()
+    data = cache.get(kind, appid, steamid)
+    if data is None:
+        data = fetch()
+        cache.put(kind, data, appid, steamid)
+    return data
@@ -40,6 +40,28 @@ class SteamConfig:
                 "or add api_key in [steam] section of config.ini"
             )
 
+    def _get_keys(self, env_variable: str, section: str, get_single_key) -> list[str]:
+        """
+        Return a pool of keys from a comma-separated `<env_variable>S`
+        environment variable or `api_keys` option, else the single key.
+        """
+        keys = os.environ.get(f"{env_variable}S")
+        if keys:
+            logger.debug("Using API keys from %sS environment variable", env_variable)
+        else:
+            try:
+                keys = self._load_config()[section]["api_keys"]
+                logger.debug("Using API keys from [%s] section of config.ini", section)
+            except (FileNotFoundError, KeyError):
+                return [get_single_key()]
+        return [key.strip() for key in keys.split(",") if key.strip()]
+
+    def get_api_keys(self) -> list[str]:
+        return self._get_keys("STEAM_API_KEY", "steam", self.get_api_key)
+
+    def get_itad_api_keys(self) -> list[str]:
+        return self._get_keys("ITAD_API_KEY", "itad", self.get_itad_api_key)
+
     def get_user_id(self, override: Optional[str] = None) -> str:
         if override:
             logger.debug("Using Steam user ID from command line argument")
@@ -77,3 +99,24 @@ class SteamConfig:
                 "No ITAD API key found. Set ITAD_API_KEY environment variable "
                 "or add api_key in [itad] section of config.ini"
             )
+
+    def get_timeouts(self) -> dict[str, tuple[float, float]]:
+        """Per-host (connect, read) timeouts from the optional [timeouts] section."""
+        try:
+            config = self._load_config()
+        except FileNotFoundError:
+            return {}
+        if not config.has_section("timeouts"):
+            return {}
+        timeouts = {}
+        for host, value in config["timeouts"].items():
+            try:
+                connect, read = (float(x) for x in value.split(","))
+            except ValueError:
+                raise ValueError(
+                    f"Invalid timeout for {host} in config.ini: {value!r}. "
+                    "Expected connect_timeout,read_timeout in seconds."
+                )
+            timeouts[host] = (connect, read)
+        logger.debug("Using timeouts from config.ini: %s", timeouts)
+        return timeouts
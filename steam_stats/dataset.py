@@ -0,0 +1,143 @@
+import csv
+import logging
+import threading
+from pathlib import Path
+from .export import export_files, open_text
+from .inverted_index import InvertedIndex, index_filename
+
+logger = logging.getLogger(__name__)
+
+# Query filters and the inverted index field they use.
+FILTER_FIELDS = {
+    "developer": "developers",
+    "publisher": "publishers",
+    "genre": "genres",
+    "platform": "platforms",
+}
+
+
+def latest_export(directory: str = "Exports") -> str | None:
+    """
+    Return the most recent game_info_*.csv export, or directory of a
+    partitioned one, or None if there is none.
+    """
+    patterns = ["game_info_*.csv", "game_info_*.csv.gz", "game_info_*.csv.zst"]
+    exports = [path for pattern in patterns for path in Path(directory).glob(pattern)]
+    exports += [path for path in Path(directory).glob("game_info_*") if path.is_dir()]
+    return str(max(exports)) if exports else None
+
+
+class GameDataset:
+    """
+    An export kept in memory and indexed by appid, developer, publisher, genre
+    and platform, so queries don't need to reparse the TSV file.
+    """
+
+    def __init__(
+        self,
+        rows: list[dict],
+        source: str | None = None,
+        index: InvertedIndex | None = None,
+    ):
+        self.source = source
+        self.by_appid: dict[str, dict] = {}
+        for row in rows:
+            row["review_percent"] = review_percent(row)
+            self.by_appid[str(row["appid"])] = row
+        self.index = index or InvertedIndex.from_rows(rows)
+        logger.info("Indexed %d games from %s", len(self.by_appid), source)
+
+    @classmethod
+    def from_file(cls, filename: str):
+        """Load an export, or every partition of a partitioned one."""
+        rows = []
+        for name in export_files(filename):
+            with open_text(name) as f:
+                rows += csv.DictReader(f, delimiter="\t")
+        index = None
+        index_path = Path(index_filename(filename))
+        # An index older than its export may not match it anymore, rebuild it.
+        if index_path.is_file() and all(
+            index_path.stat().st_mtime >= Path(name).stat().st_mtime
+            for name in export_files(filename)
+        ):
+            logger.debug("Using inverted index %s", index_filename(filename))
+            index = InvertedIndex.load(index_filename(filename))
+        return cls(rows, source=filename, index=index)
+
+    def get(self, appid) -> dict | None:
+        return self.by_appid.get(str(appid))
+
+    def query(
+        self,
+        developer: str | None = None,
+        publisher: str | None = None,
+        genre: str | None = None,
+        platform: str | None = None,
+        min_review_percent: float | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        Return the games matching every given filter.
+
+        Name filters are exact and case-insensitive. min_review_percent is the
+        share of positive reviews, from 0 to 100.
+        """
+        filters = {
+            "developer": developer,
+            "publisher": publisher,
+            "genre": genre,
+            "platform": platform,
+        }
+        criteria = {
+            FILTER_FIELDS[name]: value
+            for name, value in filters.items()
+            if value is not None
+        }
+        if criteria:
+            appids = [str(appid) for appid in self.index.query(**criteria)]
+        else:
+            appids = self.by_appid.keys()
+
+        results = []
+        for appid in appids:
+            row = self.by_appid.get(appid)
+            if row is None:
+                continue
+            if min_review_percent is not None and (
+                row["review_percent"] is None
+                or row["review_percent"] < min_review_percent
+            ):
+                continue
+            results.append(row)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+def review_percent(row: dict) -> float | None:
+    try:
+        total_positive = int(row.get("total_positive") or 0)
+        total_reviews = int(row.get("total_reviews") or 0)
+    except ValueError:
+        return None
+    if not total_reviews:
+        return None
+    return round(total_positive / total_reviews * 100, 1)
+
+
+class DatasetStore:
+    """Holds the dataset served by the API, swapped atomically on reload."""
+
+    def __init__(self):
+        self._dataset: GameDataset | None = None
+        self._lock = threading.Lock()
+
+    def load(self, filename: str):
+        dataset = GameDataset.from_file(filename)
+        with self._lock:
+            self._dataset = dataset
+
+    def get(self) -> GameDataset | None:
+        with self._lock:
+            return self._dataset
@@ -0,0 +1,224 @@
+import csv
+import gzip
+import io
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+import pandas as pd
+from .metrics import add_derived_metrics, add_release_dates
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Columns exports can be partitioned by
+PARTITION_COLUMNS = ["type", "release_year"]
+
+INT_COLUMNS = {
+    "achieved_achievements": "Int64",
+    "total_achievements": "Int64",
+    "total_positive": "Int64",
+    "total_negative": "Int64",
+    "total_reviews": "Int64",
+    "release_timestamp": "Int64",
+}
+
+
+def prepare_games(game_dicts, export_time: str, extra_columns=()) -> pd.DataFrame:
+    """Build the export rows of a chunk of games, with derived metrics and types."""
+    df = pd.DataFrame(game_dicts)
+    # Games without extra data must still have the columns, like every chunk.
+    for column in extra_columns:
+        if column not in df:
+            df[column] = None
+    df = add_derived_metrics(add_release_dates(df), export_time)
+    return df.astype(INT_COLUMNS)
+
+
+def open_text(filename: str, mode: str = "r"):
+    """
+    Open a text file, compressed with gzip or zstd (multi-threaded) when its
+    name ends with .gz or .zst.
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, f"{mode}t", encoding="utf-8", newline="")
+    if filename.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is needed to read and write .zst files.")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor(threads=-1).stream_writer(
+                open(filename, "wb"), closefd=True
+            )
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(
+                open(filename, "rb"), closefd=True
+            )
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    return open(filename, mode, encoding="utf-8", newline="")
+
+
+def export_files(filename: str) -> list[str]:
+    """The files of an export: itself, or its partitions for a directory."""
+    path = Path(filename)
+    if not path.is_dir():
+        return [filename]
+    # Resolve the link to the current generation once, so that all the
+    # partitions come from the same export even if a new one is published.
+    path = path.resolve()
+    return sorted(str(x) for x in path.glob("*=*") if not x.name.startswith("."))
+
+
+def read_export(filename: str, chunksize: int = 10000):
+    """
+    Yield the rows of an export, or of every partition of a partitioned one,
+    in chunks, as the strings written to it.
+    """
+    for name in export_files(filename):
+        with open_text(name) as f:
+            yield from pd.read_csv(
+                f, sep="\t", dtype=str, keep_default_na=False, chunksize=chunksize
+            )
+
+
+class TsvWriter:
+    """
+    Append chunks of rows to a TSV file, so a whole export never needs to be
+    held in memory. Every chunk is written with the columns of the first one.
+
+    Rows go to a temporary file renamed to filename on close(), so readers
+    never see a half-written export.
+    """
+
+    def __init__(self, filename: str, columns: list[str] | None = None):
+        self.filename = filename
+        self.columns = columns
+        self.rows = 0
+        # Hidden from globs, with the extension of filename for open_text()
+        path = Path(filename)
+        self._tmp_path = str(path.with_name(f".tmp_{path.name}"))
+        self._file = None
+
+    def _write(self, df: pd.DataFrame):
+        if self._file is None:
+            self._file = open_text(self._tmp_path, "w")
+        df.to_csv(
+            self._file,
+            header=self.rows == 0,
+            sep="\t",
+            index=False,
+            quoting=csv.QUOTE_MINIMAL,
+            date_format="%Y-%m-%d",
+        )
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(df.columns)
+        self._write(df.reindex(columns=self.columns))
+        self.rows += len(df)
+        logger.debug("Wrote %d rows to %s", self.rows, self.filename)
+
+    def close(self):
+        # Leave an empty export rather than no file when no game was exported.
+        if self.rows == 0:
+            self._write(pd.DataFrame(columns=self.columns or []))
+        if self._file is not None:
+            self._file.close()
+        os.replace(self._tmp_path, self.filename)
+
+    def abort(self):
+        """Drop the rows written so far, leaving any previous file in place."""
+        if self._file is not None:
+            self._file.close()
+        Path(self._tmp_path).unlink(missing_ok=True)
+
+
+def partition_directory(filename: str) -> str:
+    """Exports/game_info.csv.gz -> Exports/game_info"""
+    path = Path(filename)
+    return str(path.parent / path.name.partition(".")[0])
+
+
+def partition_filename(filename: str, column: str, value) -> str:
+    """Exports/game_info.csv.gz -> Exports/game_info/type=game.csv.gz"""
+    extension = Path(filename).name.partition(".")[2]
+    return str(Path(partition_directory(filename)) / f"{column}={value}.{extension}")
+
+
+class PartitionedWriter:
+    """
+    Write rows to one TsvWriter per value of a partition column (type or
+    release year), each in its own file of a directory named after filename.
+    The directory is the export read back by read_export and the API.
+
+    The partitions are written to a new hidden generation directory, published
+    on close() by atomically replacing the directory symlink, so readers see
+    either the previous set of partitions or the new one. The previous
+    generation is kept for readers still going through it.
+    """
+
+    def __init__(self, filename: str, partition_by: str):
+        if partition_by not in PARTITION_COLUMNS:
+            raise ValueError(f"Can't partition exports by {partition_by}.")
+        self.filename = filename
+        self.partition_by = partition_by
+        self.columns: list[str] | None = None
+        self.writers: dict[str, TsvWriter] = {}
+        self.directory = partition_directory(filename)
+        path = Path(self.directory)
+        self._generation = path.with_name(f".{path.name}.{time.time_ns()}")
+        self._generation.mkdir(parents=True)
+
+    @property
+    def rows(self) -> int:
+        return sum(writer.rows for writer in self.writers.values())
+
+    def _partition_values(self, df: pd.DataFrame) -> pd.Series:
+        if self.partition_by == "release_year":
+            values = pd.to_datetime(df["release_date"], errors="coerce").dt.year
+            return values.astype("Int64").astype("string").fillna("unknown")
+        return df[self.partition_by].astype("string").fillna("unknown")
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(df.columns)
+        for value, partition in df.groupby(self._partition_values(df), sort=False):
+            value = str(value)
+            if value not in self.writers:
+                name = Path(partition_filename(self.filename, self.partition_by, value))
+                self.writers[value] = TsvWriter(
+                    str(self._generation / name.name), self.columns
+                )
+            self.writers[value].write(partition)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        path = Path(self.directory)
+        previous = path.resolve() if path.is_symlink() else None
+        if path.is_dir() and not path.is_symlink():
+            # A plain directory can't be swapped atomically, replace it once
+            shutil.rmtree(path)
+        link = path.with_name(f".tmp_{path.name}")
+        link.unlink(missing_ok=True)
+        link.symlink_to(self._generation.name)
+        os.replace(link, path)
+        for generation in path.parent.glob(f".{path.name}.*"):
+            if generation.is_dir() and generation.resolve() not in (
+                self._generation.resolve(),
+                previous,
+            ):
+                shutil.rmtree(generation)
+
+    def abort(self):
+        for writer in self.writers.values():
+            writer.abort()
+        shutil.rmtree(self._generation, ignore_errors=True)
@@ -0,0 +1,156 @@
+import bisect
+import gzip
+import itertools
+import json
+import logging
+import os
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Export columns holding comma-joined lists, indexed by term.
+INDEXED_FIELDS = ["genres", "developers", "publishers"]
+PLATFORMS = ["windows", "linux", "mac"]
+
+
+def index_filename(export_filename: str) -> str:
+    return f"{export_filename}.index.json.gz"
+
+
+def split_field(value) -> list[str]:
+    if not isinstance(value, str) or not value:
+        return []
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+
+def intersect(a: array, b: array) -> array:
+    """Intersect two sorted posting lists."""
+    if len(a) > len(b):
+        a, b = b, a
+    result = array("I")
+    # Gallop through the longer list when the sizes are very different.
+    if len(a) * 8 < len(b):
+        lo = 0
+        for x in a:
+            lo = bisect.bisect_left(b, x, lo)
+            if lo == len(b):
+                break
+            if b[lo] == x:
+                result.append(x)
+        return result
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class InvertedIndex:
+    """
+    Map each term of a field (a tag, a developer, a platform...) to the sorted
+    array of appids having it.
+
+    Terms are matched case-insensitively. The index is persisted next to the
+    export as gzipped JSON with delta-encoded posting lists.
+    """
+
+    def __init__(self, postings: dict[str, dict[str, array]] | None = None):
+        self.postings = postings or {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        builder = InvertedIndexBuilder()
+        builder.add(rows)
+        return builder.build()
+
+    def get(self, field: str, term: str) -> array:
+        return self.postings.get(field, {}).get(term.lower(), array("I"))
+
+    def terms(self, field: str) -> list[str]:
+        return sorted(self.postings.get(field, {}))
+
+    def query(self, **criteria) -> array:
+        """
+        Return the sorted appids matching every criterion.
+
+        Each keyword is a field name and its value a term or a list of terms,
+        e.g. query(genres=["Roguelike", "Pixel Graphics"], platforms="linux").
+        """
+        lists = []
+        for field, terms in criteria.items():
+            if isinstance(terms, str):
+                terms = [terms]
+            lists.extend(self.get(field, term) for term in terms)
+        if not lists:
+            return array("I")
+        # Start with the shortest lists to keep intermediate results small.
+        lists.sort(key=len)
+        result = lists[0]
+        for posting in lists[1:]:
+            if not result:
+                break
+            result = intersect(result, posting)
+        return result
+
+    def save(self, filename: str):
+        data = {
+            field: {term: delta_encode(ids) for term, ids in terms.items()}
+            for field, terms in self.postings.items()
+        }
+        tmp_filename = f"{filename}.tmp"
+        with gzip.open(tmp_filename, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_filename, filename)
+        logger.debug("Wrote inverted index %s", filename)
+
+    @classmethod
+    def load(cls, filename: str):
+        with gzip.open(filename, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            {
+                field: {term: delta_decode(deltas) for term, deltas in terms.items()}
+                for field, terms in data.items()
+            }
+        )
+
+
+class InvertedIndexBuilder:
+    """Build an InvertedIndex from rows added chunk by chunk."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, set[int]]] = {
+            field: {} for field in [*INDEXED_FIELDS, "platforms"]
+        }
+
+    def add(self, rows):
+        for row in rows:
+            appid = int(row["appid"])
+            for field in INDEXED_FIELDS:
+                for term in split_field(row.get(field)):
+                    self.postings[field].setdefault(term.lower(), set()).add(appid)
+            for platform in PLATFORMS:
+                if str(row.get(platform)) == "True":
+                    self.postings["platforms"].setdefault(platform, set()).add(appid)
+
+    def build(self) -> InvertedIndex:
+        return InvertedIndex(
+            {
+                field: {term: array("I", sorted(ids)) for term, ids in terms.items()}
+                for field, terms in self.postings.items()
+            }
+        )
+
+
+def delta_encode(ids: array) -> list[int]:
+    return [ids[0], *(b - a for a, b in itertools.pairwise(ids))] if ids else []
+
+
+def delta_decode(deltas: list[int]) -> array:
+    return array("I", itertools.accumulate(deltas))
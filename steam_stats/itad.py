@@ -1,16 +1,30 @@
 import logging
+import urllib.parse
 from .requests import get_json
 
 logger = logging.getLogger(__name__)
 
+# Number of games per request for the endpoints accepting several plains
+ITAD_BATCH_SIZE = 50
+# Columns added to the export by get_itad_data
+ITAD_COLUMNS = [
+    "plain",
+    "historical_low_price",
+    "historical_low_currency",
+    "historical_low_shop",
+    "current_price_price",
+    "current_price_currency",
+    "current_price_shop",
+]
 
-def get_itad_plain(s, api_key, appid):
+
+def get_itad_plain(s, keys, appid):
     url = (
         "https://api.isthereanydeal.com/"
-        f"v02/game/plain/?key={api_key}"
+        f"v02/game/plain/?key={{key}}"
         f"&shop=steam&game_id=app%2F{appid}&url=&title=&optional="
     )
-    result = get_json(s, url)
+    result = get_json(s, url, keys)
     logger.debug(f"{url}: {result}")
     if result:
         if isinstance(result["data"], dict):
@@ -19,12 +33,12 @@ def get_itad_plain(s, api_key, appid):
     return None
 
 
-def get_itad_historical_low(s, api_key, plain, region, country):
+def get_itad_historical_low(s, keys, plain, region, country):
     url = (
         "https://api.isthereanydeal.com/v01/game/lowest/"
-        f"?key={api_key}&plains={plain}&region={region}&country={country}"
+        f"?key={{key}}&plains={plain}&region={region}&country={country}"
     )
-    result = get_json(s, url)
+    result = get_json(s, url, keys)
     logger.debug(f"{url}: {result}")
     if result and plain in result["data"]:
         return {
@@ -42,13 +56,13 @@ def get_itad_historical_low(s, api_key, plain, region, country):
         return None
 
 
-def get_itad_current_price(s, api_key, appid, plain, region, country):
+def get_itad_current_price(s, keys, appid, plain, region, country):
     url = (
         "https://api.isthereanydeal.com/v01/game/prices/"
-        f"?key={api_key}&plains={plain}&region={region}&country={country}"
+        f"?key={{key}}&plains={plain}&region={region}&country={country}"
         "&shops=steam&added=0"
     )
-    result = get_json(s, url)
+    result = get_json(s, url, keys)
     # for some reasons there are sometimes several entries for one game. Get the one with the correct Steam URL.
     correct_result = None
     for x in result["data"][plain]["list"]:
@@ -71,12 +85,12 @@ def get_itad_current_price(s, api_key, appid, plain, region, country):
         return None
 
 
-def get_itad_data(s, api_key, appid):
+def get_itad_data(s, keys, appid, region="eu1", country="FR"):
     # plain is the internal itad id for a game
-    plain = get_itad_plain(s, api_key, appid)
+    plain = get_itad_plain(s, keys, appid)
     if plain:
-        historical_low = get_itad_historical_low(s, api_key, plain, "eu1", "FR")
-        current_price = get_itad_current_price(s, api_key, appid, plain, "eu1", "FR")
+        historical_low = get_itad_historical_low(s, keys, plain, region, country)
+        current_price = get_itad_current_price(s, keys, appid, plain, region, country)
     else:
         historical_low = None
         current_price = None
@@ -105,3 +119,66 @@ def get_itad_data(s, api_key, appid):
         }
     else:
         return None
+
+
+def get_itad_plains(s, keys, appids) -> dict[str, str]:
+    """Return the plains of several Steam games, as a dict appid -> plain."""
+    plains = {}
+    for i in range(0, len(appids), ITAD_BATCH_SIZE):
+        ids = ",".join(f"app/{appid}" for appid in appids[i : i + ITAD_BATCH_SIZE])
+        url = (
+            "https://api.isthereanydeal.com/v01/game/plain/id/"
+            f"?key={{key}}&shop=steam&ids={urllib.parse.quote(ids)}"
+        )
+        result = get_json(s, url, keys)
+        logger.debug(f"{url}: {result}")
+        if result and isinstance(result.get("data"), dict):
+            for steam_id, plain in result["data"].items():
+                if plain:
+                    plains[steam_id.removeprefix("app/")] = plain
+    return plains
+
+
+def get_itad_prices_batch(s, keys, plains: dict[str, str], region, country):
+    """
+    Return the current Steam price and the historical low of several games in
+    one region, as a dict appid -> prices.
+    """
+    prices = {}
+    items = list(plains.items())
+    for i in range(0, len(items), ITAD_BATCH_SIZE):
+        batch = dict(items[i : i + ITAD_BATCH_SIZE])
+        joined_plains = ",".join(batch.values())
+        url_lowest = (
+            "https://api.isthereanydeal.com/v01/game/lowest/"
+            f"?key={{key}}&plains={joined_plains}&region={region}&country={country}"
+        )
+        url_prices = (
+            "https://api.isthereanydeal.com/v01/game/prices/"
+            f"?key={{key}}&plains={joined_plains}&region={region}&country={country}"
+            "&shops=steam&added=0"
+        )
+        lowest = get_json(s, url_lowest, keys) or {}
+        current = get_json(s, url_prices, keys) or {}
+        currency = lowest.get(".meta", {}).get("currency")
+        for appid, plain in batch.items():
+            game_lowest = lowest.get("data", {}).get(plain, {})
+            # Several entries can exist for one game, keep the one of this appid.
+            game_current = next(
+                (
+                    x
+                    for x in current.get("data", {}).get(plain, {}).get("list", [])
+                    if str(appid) in x.get("url", "")
+                ),
+                {},
+            )
+            prices[appid] = {
+                "plain": plain,
+                "historical_low_price": game_lowest.get("price"),
+                "historical_low_currency": currency,
+                "historical_low_shop": game_lowest.get("shop", {}).get("name"),
+                "current_price_price": game_current.get("price_new"),
+                "current_price_currency": current.get(".meta", {}).get("currency"),
+                "current_price_shop": game_current.get("shop", {}).get("name"),
+            }
+    return prices
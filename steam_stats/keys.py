@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Calls allowed per key and per day by the Steam Web API terms
+DEFAULT_DAILY_BUDGET = 100_000
+# Seconds a rate-limited key stays out of rotation, doubled at each new 429
+COOLDOWN = 60
+MAX_COOLDOWN = 3600
+
+
+class KeyPool:
+    """
+    Distribute requests across several API keys.
+
+    Each request uses the key with the most remaining budget. Keys answering
+    429, or 401/403 because of the key itself, are taken out of rotation for
+    a while.
+    """
+
+    def __init__(self, keys: list[str], daily_budget: int = DEFAULT_DAILY_BUDGET):
+        if not keys:
+            raise ValueError("No API key given.")
+        self.daily_budget = daily_budget
+        self.used = dict.fromkeys(keys, 0)
+        self.cooldown_until = dict.fromkeys(keys, 0.0)
+        self._cooldown = dict.fromkeys(keys, COOLDOWN)
+        self._day = time.gmtime().tm_yday
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.used)
+
+    def _available(self, now: float) -> list[str]:
+        # Budgets are daily, start over when a long-running process sees a new day
+        day = time.gmtime(now).tm_yday
+        if day != self._day:
+            self._day = day
+            self.used = dict.fromkeys(self.used, 0)
+        return [
+            key
+            for key, used in self.used.items()
+            if self.cooldown_until[key] <= now and used < self.daily_budget
+        ]
+
+    def has_available(self) -> bool:
+        with self._lock:
+            return bool(self._available(time.time()))
+
+    def acquire(self) -> str:
+        """Return the key to use for the next request, waiting if none is usable."""
+        while True:
+            with self._lock:
+                now = time.time()
+                available = self._available(now)
+                if available:
+                    key = min(available, key=self.used.__getitem__)
+                    self.used[key] += 1
+                    return key
+                # Keys out of budget stay unusable until the next day
+                resting = [
+                    self.cooldown_until[key]
+                    for key, used in self.used.items()
+                    if used < self.daily_budget
+                ]
+                if not resting:
+                    raise RuntimeError("Daily budget of every API key is exhausted.")
+                wait = min(resting) - now
+            logger.warning("All API keys are rate-limited, waiting %.0f seconds", wait)
+            time.sleep(wait)
+
+    def report(self, key: str, status_code: int, body: str = ""):
+        """
+        Take the answer to a request made with key into account. body is only
+        needed for 403 answers, to tell a rejected key from a private profile.
+        """
+        with self._lock:
+            if status_code == 429 or is_key_rejected(status_code, body):
+                self._rest(key)
+            else:
+                self._cooldown[key] = COOLDOWN
+
+    def _rest(self, key: str):
+        self.cooldown_until[key] = time.time() + self._cooldown[key]
+        logger.warning(
+            "API key ...%s taken out of rotation for %d seconds",
+            key[-4:],
+            self._cooldown[key],
+        )
+        self._cooldown[key] = min(self._cooldown[key] * 2, MAX_COOLDOWN)
+
+
+def is_key_rejected(status_code: int, body: str) -> bool:
+    """
+    Whether an answer rejects the API key itself. A 403 also answers requests
+    about private profiles (e.g. GetPlayerAchievements), with a playerstats
+    error in its body, which says nothing about the key.
+    """
+    if status_code == 401:
+        return True
+    return status_code == 403 and "playerstats" not in body and "key" in body.lower()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# z-score of the 95% confidence interval used by the Wilson score.
+WILSON_Z = 1.96
+# Games released less than a month ago count as one month old.
+MIN_AGE_YEARS = 1 / 12
+# Date formats returned by the legacy appdetails API ("Feb 24, 2017", "24 Feb, 2017").
+LEGACY_DATE_FORMATS = ["%b %d, %Y", "%d %b, %Y"]
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype="float64")
+
+
+def add_release_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn release_date into a datetime column, from release_timestamp or, for
+    games fetched through the legacy API, from its date string. Games only
+    known by a date string get their release_timestamp filled as well.
+
+    Date strings that aren't dates ("Coming soon", "Q2 2026", "Feb 2017") are
+    kept as they are in release_date_text.
+    """
+    release = pd.Series(
+        pd.to_datetime(_numeric(df, "release_timestamp"), unit="s"), index=df.index
+    )
+    if "release_date" in df:
+        for date_format in LEGACY_DATE_FORMATS:
+            missing = release.isna()
+            if not missing.any():
+                break
+            release = release.where(
+                ~missing,
+                pd.to_datetime(df["release_date"], format=date_format, errors="coerce"),
+            )
+    text = df["release_date"] if "release_date" in df else pd.Series(index=df.index)
+    df["release_date_text"] = text.where(release.isna() & text.notna(), None)
+    df["release_date"] = release
+    df["release_timestamp"] = (release - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    return df
+
+
+def add_derived_metrics(df: pd.DataFrame, export_time: str) -> pd.DataFrame:
+    """
+    Compute the metrics derived from the fetched columns, for all games at once.
+
+    - total_positive/total_negative, when only review_score (percent of
+      positive reviews) and total_reviews are known
+    - achievement_percentage
+    - wilson_lower_bound: lower bound of the 95% Wilson score interval of the
+      share of positive reviews
+    - reviews_per_year since the release date
+    - price_to_historical_low, when ITAD prices were fetched
+    """
+    total_reviews = _numeric(df, "total_reviews")
+    review_score = _numeric(df, "review_score")
+
+    total_positive = _numeric(df, "total_positive")
+    total_negative = _numeric(df, "total_negative")
+    missing = np.isnan(total_positive)
+    has_score = (total_reviews > 0) & (review_score > 0)
+    derived_positive = np.where(
+        has_score, np.floor((review_score / 100) * total_reviews), 0
+    )
+    df["total_positive"] = np.where(missing, derived_positive, total_positive)
+    df["total_negative"] = np.where(
+        missing,
+        np.where(has_score, total_reviews - derived_positive, 0),
+        total_negative,
+    )
+
+    achieved = _numeric(df, "achieved_achievements")
+    total_achievements = _numeric(df, "total_achievements")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["achievement_percentage"] = np.where(
+            total_achievements > 0,
+            np.round(achieved / total_achievements * 100, 1),
+            np.nan,
+        )
+
+        n = _numeric(df, "total_positive") + _numeric(df, "total_negative")
+        p = _numeric(df, "total_positive") / n
+        z2 = WILSON_Z**2
+        wilson = (
+            p + z2 / (2 * n) - WILSON_Z * np.sqrt(p * (1 - p) / n + z2 / (4 * n**2))
+        ) / (1 + z2 / n)
+        df["wilson_lower_bound"] = np.where(n > 0, np.round(wilson, 4), np.nan)
+
+        age_years = (pd.Timestamp(export_time) - df["release_date"]).dt.days.to_numpy(
+            dtype="float64"
+        ) / 365.25
+        df["reviews_per_year"] = np.round(
+            total_reviews / np.maximum(age_years, MIN_AGE_YEARS), 1
+        )
+
+        if "historical_low_price" in df and "current_price_price" in df:
+            historical_low = _numeric(df, "historical_low_price")
+            df["price_to_historical_low"] = np.where(
+                historical_low > 0,
+                np.round(_numeric(df, "current_price_price") / historical_low, 2),
+                np.nan,
+            )
+    return df
@@ -0,0 +1,216 @@
+import csv
+import gc
+import glob
+import itertools
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from .export import open_text
+
+logger = logging.getLogger(__name__)
+
+
+def expand_inputs(patterns: list[str]) -> list[str]:
+    """Expand the globs of the input files, "-" standing for stdin."""
+    filenames = []
+    for pattern in patterns:
+        if pattern == "-":
+            filenames.append(pattern)
+            continue
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for filename in matches:
+            if not Path(filename).is_file():
+                raise FileNotFoundError(f"{filename} is not a file. Exiting.")
+        filenames += matches
+    return filenames
+
+
+def _read_rows(f, name: str):
+    header = f.readline()
+    # Tab separated like the exports of the scripts, or comma/semicolon separated
+    delimiter = max("\t,;", key=header.count)
+    fieldnames = [x.strip() for x in next(csv.reader([header], delimiter=delimiter))]
+    if "appid" in fieldnames:
+        column = fieldnames.index("appid")
+    elif fieldnames and fieldnames[0].isdigit():
+        # A plain list of appids without header
+        column = 0
+        yield fieldnames[0]
+    else:
+        raise ValueError(f"No appid column found in {name}.")
+    for row in csv.reader(f, delimiter=delimiter):
+        if len(row) > column and row[column].strip():
+            yield row[column].strip()
+
+
+def read_appids(filename: str):
+    """Yield the appids of a file with an appid column ("-" for stdin), row by row."""
+    if filename == "-":
+        yield from _read_rows(sys.stdin, "stdin")
+        return
+    with open_text(filename) as f:
+        yield from _read_rows(f, filename)
+
+
+def read_all_appids(filenames: list[str], buffer: int = 10000):
+    """
+    Read several input files in parallel threads and yield their appids in the
+    order of the files, so the first batches can be fetched before reading is
+    over. Each file reads at most `buffer` appids ahead of the consumer.
+    """
+    if len(filenames) == 1:
+        yield from read_appids(filenames[0])
+        return
+
+    def read(filename, ids: queue.Queue):
+        try:
+            for appid in read_appids(filename):
+                ids.put(appid)
+        except Exception as e:
+            ids.put(e)
+        finally:
+            ids.put(_DONE)
+
+    queues = [queue.Queue(maxsize=buffer) for _ in filenames]
+    for filename, ids in zip(filenames, queues):
+        threading.Thread(target=read, args=(filename, ids), daemon=True).start()
+    for ids in queues:
+        while (appid := ids.get()) is not _DONE:
+            if isinstance(appid, Exception):
+                raise appid
+            yield appid
+
+
+def unique(ids):
+    """Yield ids in order, skipping the ones already seen."""
+    seen = set()
+    duplicates = 0
+    for x in ids:
+        if x in seen:
+            duplicates += 1
+            continue
+        seen.add(x)
+        yield x
+    if duplicates:
+        logger.info("Skipped %d duplicate appids", duplicates)
+
+
+def batched(ids, size: int):
+    ids = iter(ids)
+    while batch := list(itertools.islice(ids, size)):
+        yield batch
+
+
+def current_rss() -> int | None:
+    """Resident memory of the process in bytes, None if it can't be measured."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    # Not on Linux: ps reports the current RSS in kB on macOS and the BSDs.
+    try:
+        output = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(os.getpid())],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return int(output.strip()) * 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+_DONE = object()
+
+
+class BatchPrefetcher:
+    """
+    Fetch batches in a background thread while the previous ones are processed.
+
+    At most `prefetch` fetched batches wait in the queue, so a slow writing
+    stage holds back fetching. With max_memory (in bytes), fetching also waits
+    for the queue to drain whenever the process goes over the cap. This only
+    bounds the batches in flight: memory held elsewhere isn't released by it.
+
+    close() stops the background thread, e.g. when processing fails.
+    """
+
+    def __init__(self, batches, fetch, prefetch: int = 1, max_memory=None):
+        self.batches = batches
+        self.fetch = fetch
+        self.max_memory = max_memory
+        self.queue: queue.Queue = queue.Queue(maxsize=prefetch)
+        self.error: BaseException | None = None
+        self._closed = threading.Event()
+        self._over_cap = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _wait_for_memory(self):
+        if self.max_memory is None:
+            return
+        rss = current_rss()
+        if rss is None:
+            logger.warning("Can't measure memory use here, ignoring --max-memory")
+            self.max_memory = None
+            return
+        if rss <= self.max_memory:
+            self._over_cap = False
+            return
+        # Warn once per excursion over the cap rather than at every batch.
+        log = logger.debug if self._over_cap else logger.warning
+        log(
+            "RSS %.0f MB over the %.0f MB cap, waiting for pending batches",
+            rss / 2**20,
+            self.max_memory / 2**20,
+        )
+        self._over_cap = True
+        while self.queue.unfinished_tasks and not self._closed.wait(0.1):
+            pass
+        gc.collect()
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            for batch in self.batches:
+                self._wait_for_memory()
+                if self._closed.is_set() or not self._put((batch, self.fetch(batch))):
+                    return
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._put(_DONE)
+
+    def close(self):
+        self._closed.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        self._thread.start()
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                break
+            yield item
+            self.queue.task_done()
+        if self.error is not None:
+            raise self.error
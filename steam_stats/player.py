@@ -0,0 +1,11 @@
+from .cache import MetadataCache, cached
+
+
+def get_owned_games(s, api_key, user_id, cache: MetadataCache | None = None):
+    """Return the games owned by a user, as listed by GetOwnedGames."""
+    url = (
+        "http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/"
+        f"?key={api_key}&steamid={user_id}&format=json&include_played_free_games=1"
+    )
+    json_dict = cached(cache, "owned_games", lambda: s.get(url).json(), steamid=user_id)
+    return json_dict["response"]["games"]
@@ -0,0 +1,92 @@
+import logging
+from .itad import ITAD_COLUMNS, get_itad_plains, get_itad_prices_batch
+from .store import PRICE_DATA_REQUEST, get_games_batch
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = [
+    "appid",
+    "region",
+    "country",
+    "steam_price",
+    "steam_original_price",
+    "steam_discount_pct",
+    "steam_formatted_price",
+    *ITAD_COLUMNS,
+]
+
+
+def parse_regions(value: str) -> list[tuple[str, str]]:
+    """Parse a --regions value like "eu1:FR,us:US" into (region, country) pairs."""
+    regions = []
+    for pair in value.split(","):
+        region, _, country = pair.strip().partition(":")
+        if not region or not country:
+            raise ValueError(
+                f"Invalid region {pair!r}, expected ITAD_REGION:COUNTRY (e.g. eu1:FR)."
+            )
+        regions.append((region.lower(), country.upper()))
+    return regions
+
+
+def cents_to_price(cents) -> float | None:
+    return int(cents) / 100 if cents is not None else None
+
+
+def get_steam_prices(s, appids, country_code: str) -> dict[str, dict]:
+    """Return the Steam store price of several games in one country."""
+    games_data = get_games_batch(
+        s, appids, country_code=country_code, data_request=PRICE_DATA_REQUEST
+    )
+    prices = {}
+    for appid, store_item in games_data.items():
+        purchase_option = store_item.get("best_purchase_option", {})
+        prices[appid] = {
+            "steam_price": cents_to_price(purchase_option.get("final_price_in_cents")),
+            "steam_original_price": cents_to_price(
+                purchase_option.get("original_price_in_cents")
+            ),
+            "steam_discount_pct": purchase_option.get("discount_pct", 0),
+            "steam_formatted_price": purchase_option.get("formatted_final_price"),
+        }
+    return prices
+
+
+def get_price_rows(s, appids, regions, itad_api_keys=None) -> list[dict]:
+    """
+    Collect the prices of a batch of games in every (region, country) pair.
+
+    Steam prices are fetched once per country. ITAD current and historical-low
+    prices are only fetched when the itad_api_keys pool is set, with one request per
+    region for all the games of the batch.
+    """
+    appids = [str(appid) for appid in appids]
+    steam_prices = {
+        country: get_steam_prices(s, appids, country)
+        for country in dict.fromkeys(country for _, country in regions)
+    }
+    plains = get_itad_plains(s, itad_api_keys, appids) if itad_api_keys else {}
+
+    rows = []
+    for region, country in regions:
+        itad_prices = (
+            get_itad_prices_batch(s, itad_api_keys, plains, region, country)
+            if plains
+            else {}
+        )
+        for appid in appids:
+            steam_price = steam_prices[country].get(appid)
+            itad_price = itad_prices.get(appid)
+            if steam_price is None and itad_price is None:
+                continue
+            rows.append(
+                {
+                    "appid": appid,
+                    "region": region,
+                    "country": country,
+                    **(steam_price or {}),
+                    **(itad_price or {}),
+                }
+            )
+    logger.debug("Collected %d price rows for %d games", len(rows), len(appids))
+    return rows
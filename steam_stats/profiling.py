@@ -0,0 +1,126 @@
+import cProfile
+import collections
+import contextlib
+import json
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two stack samples
+SAMPLE_INTERVAL = 0.005
+
+
+class Profiler:
+    """
+    Profile a run: cProfile of the main thread, stack samples of every thread
+    (collapsed stacks, loadable in speedscope or flamegraph.pl) and wall/CPU
+    time per named pipeline stage.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.profile = cProfile.Profile()
+        self.stages: dict[str, dict[str, float]] = collections.defaultdict(
+            lambda: {"calls": 0, "wall": 0.0, "cpu": 0.0}
+        )
+        self.samples: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self._stop.set()
+        self._sampler.join()
+        self.write()
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        wall = time.perf_counter()
+        # Stages run in worker threads too, count the CPU time of the calling thread.
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                stage = self.stages[name]
+                stage["calls"] += 1
+                stage["wall"] += time.perf_counter() - wall
+                stage["cpu"] += time.thread_time() - cpu
+
+    def write(self):
+        self.profile.dump_stats(f"{self.prefix}.prof")
+        with open(f"{self.prefix}.collapsed.txt", "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(f"{self.prefix}.stages.json", "w") as f:
+            json.dump(self.stages, f, indent=2)
+        logger.info(
+            "Profile written to %s.{prof,collapsed.txt,stages.json}", self.prefix
+        )
+        for name, stage in sorted(
+            self.stages.items(), key=lambda x: x[1]["wall"], reverse=True
+        ):
+            logger.info(
+                "%-20s %6d calls  wall %8.2fs  cpu %8.2fs",
+                name,
+                stage["calls"],
+                stage["wall"],
+                stage["cpu"],
+            )
+
+
+_profiler: Profiler | None = None
+
+
+def start_profiling(prefix: str) -> Profiler:
+    global _profiler
+    _profiler = Profiler(prefix)
+    _profiler.start()
+    return _profiler
+
+
+def stop_profiling():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+
+
+def span(name: str):
+    """Time a pipeline stage when profiling is enabled, do nothing otherwise."""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.span(name)
+
+
+def profiled(function, name: str):
+    """Wrap function so that each call is timed as the stage name."""
+
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,96 @@
+import gzip
+import json
+import logging
+import threading
+import urllib.parse
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Query parameters removed from recorded URLs, so archives hold no secrets and
+# can be replayed without a config file.
+REDACTED_PARAMS = {"key", "steamid"}
+
+
+def redact(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    query = [
+        (name, "REDACTED" if name in REDACTED_PARAMS else value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urllib.parse.urlunsplit(
+        parts._replace(query=urllib.parse.urlencode(query, safe="/,"))
+    )
+
+
+class RecordingSession:
+    """
+    Wrap a requests session and append every exchange made through get() to a
+    gzipped JSON lines archive, to be replayed later with ReplaySession.
+    """
+
+    def __init__(self, session, archive: str):
+        self.session = session
+        self.archive = archive
+        self._file = gzip.open(archive, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        exchange = {
+            "url": redact(url),
+            "status": response.status_code,
+            "body": response.text,
+        }
+        with self._lock:
+            self._file.write(json.dumps(exchange) + "\n")
+            self.count += 1
+        return response
+
+    def close(self):
+        self._file.close()
+        logger.info("Recorded %d requests to %s", self.count, self.archive)
+
+
+class ReplaySession:
+    """
+    Answer get() calls from an archive written by RecordingSession, without
+    any network access.
+
+    Responses of a URL requested several times are returned in the recorded
+    order, the last one being repeated once they are exhausted.
+    """
+
+    def __init__(self, archive: str):
+        self.archive = archive
+        self.responses: dict[str, list[tuple[int, str]]] = {}
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+        with gzip.open(archive, "rt", encoding="utf-8") as f:
+            for line in f:
+                exchange = json.loads(line)
+                self.responses.setdefault(exchange["url"], []).append(
+                    (exchange["status"], exchange["body"])
+                )
+        logger.info("Loaded %d recorded URLs from %s", len(self.responses), archive)
+
+    def get(self, url, **kwargs):
+        key = redact(url)
+        if key not in self.responses:
+            raise requests.ConnectionError(f"No recorded response for {key}")
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        recorded = self.responses[key]
+        status, body = recorded[min(served, len(recorded) - 1)]
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def close(self):
+        pass
@@ -1,13 +1,150 @@
+import collections
 import logging
+import threading
 import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from .profiling import span
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts in seconds, per host
+DEFAULT_TIMEOUT = (3.05, 30)
+TIMEOUTS = {
+    "api.steampowered.com": (3.05, 30),
+    "store.steampowered.com": (3.05, 20),
+    "api.isthereanydeal.com": (3.05, 15),
+}
+# Hedged requests: once a request takes longer than the HEDGE_PERCENTILE of the
+# recent latencies of its host, a duplicate is sent and the first answer wins.
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 500
+_hedge = {"enabled": False}
+_hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="http")
+_latencies: dict[str, collections.deque] = collections.defaultdict(
+    lambda: collections.deque(maxlen=HEDGE_WINDOW)
+)
+_latencies_lock = threading.Lock()
 
-def get_steam_json(s, url, appid):
+# Requests currently in flight, keyed by URL. Concurrent callers asking for the
+# same URL wait on the first caller's future instead of issuing their own call.
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def single_flight(key, fn):
+    """Run fn() once for all concurrent callers sharing the same key."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+    if not leader:
+        logger.debug("Joining in-flight request for %s", key)
+        return future.result()
+    try:
+        result = fn()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def configure_http(timeouts: dict | None = None, hedge: bool = False):
+    """Override the timeouts of some hosts and enable hedged requests."""
+    TIMEOUTS.update(timeouts or {})
+    _hedge["enabled"] = hedge
+
+
+def _record_latency(host: str, duration: float):
+    with _latencies_lock:
+        _latencies[host].append(duration)
+
+
+def _hedge_delay(host: str) -> float | None:
+    with _latencies_lock:
+        latencies = sorted(_latencies[host])
+    if len(latencies) < HEDGE_MIN_SAMPLES:
+        return None
+    return latencies[int(HEDGE_PERCENTILE * (len(latencies) - 1))]
+
+
+def _timed_get(s, url, host, timeout):
+    start = time.perf_counter()
+    result = s.get(url, timeout=timeout)
+    _record_latency(host, time.perf_counter() - start)
+    return result
+
+
+def _discard(future: Future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _hedged_get(s, url, host, timeout, delay):
+    primary = _hedge_executor.submit(_timed_get, s, url, host, timeout)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    logger.debug("No answer from %s after %.2fs, hedging request", host, delay)
+    hedge = _hedge_executor.submit(_timed_get, s, url, host, timeout)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # The slower request can't be interrupted, drop its answer.
+                for other in pending:
+                    if not other.cancel():
+                        other.add_done_callback(_discard)
+                return future.result()
+    # Both requests failed, raise the error of the first one
+    return primary.result()
+
+
+def http_get(s, url):
+    """GET url with the timeouts of its host, hedged if enabled."""
+    host = urllib.parse.urlsplit(url).hostname or ""
+    timeout = TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+    with span("http"):
+        delay = _hedge_delay(host) if _hedge["enabled"] else None
+        if delay is None:
+            return _timed_get(s, url, host, timeout)
+        return _hedged_get(s, url, host, timeout, delay)
+
+
+def _keyed_get(s, url, keys):
+    """
+    GET url, its {key} placeholder filled with a key of the pool at each
+    attempt. A rate-limited request is retried with another key if one is
+    available.
+    """
+    while True:
+        key = keys.acquire()
+        result = http_get(s, url.format(key=key))
+        # Decoding the body is only needed to tell why a request was forbidden
+        keys.report(
+            key,
+            result.status_code,
+            result.text if result.status_code in (401, 403) else "",
+        )
+        if result.status_code == 429 and keys.has_available():
+            logger.debug("Rate-limit detected, retrying with another key.")
+            continue
+        return result
+
+
+def _get_steam_json(s, url, appid, keys=None):
     sleep_time = 10
     while True:
-        result = s.get(url)
+        result = _keyed_get(s, url, keys) if keys else http_get(s, url)
         if result.status_code == 429:
             logger.warning("Rate-limit detected, waiting for %s seconds.", sleep_time)
             time.sleep(sleep_time)
@@ -15,9 +152,21 @@ def get_steam_json(s, url, appid):
         else:
             break
     if result.text != "":
-        return result.json()
+        with span("json_decode"):
+            return result.json()
     return {str(appid): {"success": False}}
 
 
-def get_json(s, url):
-    return s.get(url).json()
+def get_steam_json(s, url, appid, keys=None):
+    return single_flight(url, lambda: _get_steam_json(s, url, appid, keys))
+
+
+def _get_json(s, url, keys=None):
+    result = _keyed_get(s, url, keys) if keys else http_get(s, url)
+    with span("json_decode"):
+        return result.json()
+
+
+def get_json(s, url, keys=None):
+    """GET a JSON url, with a {key} placeholder filled from keys if given."""
+    return single_flight(url, lambda: _get_json(s, url, keys))
@@ -0,0 +1,225 @@
+import logging
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from .export import TsvWriter
+from .requests import get_steam_json
+from .scheduler import load_state, save_state
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = "Exports/reviews_state.json"
+REVIEWS_PER_PAGE = 100
+# Reviews buffered before being written to the output file
+FLUSH_ROWS = 10000
+
+REVIEW_COLUMNS = {
+    "appid": "string",
+    "recommendationid": "string",
+    "steamid": "string",
+    "language": "string",
+    "timestamp_created": "Int64",
+    "timestamp_updated": "Int64",
+    "voted_up": "boolean",
+    "votes_up": "Int64",
+    "votes_funny": "Int64",
+    "weighted_vote_score": "float64",
+    "comment_count": "Int64",
+    "steam_purchase": "boolean",
+    "received_for_free": "boolean",
+    "written_during_early_access": "boolean",
+    "playtime_at_review": "Int64",
+    "playtime_forever": "Int64",
+    "num_games_owned": "Int64",
+    "num_reviews": "Int64",
+}
+
+
+def default_reviews_filename(export_date: str) -> str:
+    """Parquet when pyarrow is installed, gzipped TSV otherwise."""
+    extension = "parquet" if pa is not None else "csv.gz"
+    return f"Exports/reviews_{export_date}.{extension}"
+
+
+def get_reviews_page(s, appid, cursor: str = "*") -> dict:
+    """
+    Return a page of reviews of appid, most recently updated first, with the
+    cursor of the next page.
+    """
+    url = (
+        f"https://store.steampowered.com/appreviews/{appid}?json=1&filter=updated"
+        f"&language=all&purchase_type=all&num_per_page={REVIEWS_PER_PAGE}"
+        f"&cursor={urllib.parse.quote(cursor)}"
+    )
+    return get_steam_json(s, url, appid)
+
+
+def review_row(appid, review: dict) -> dict:
+    author = review.get("author", {})
+    return {
+        "appid": str(appid),
+        "recommendationid": review.get("recommendationid"),
+        "steamid": author.get("steamid"),
+        "language": review.get("language"),
+        "timestamp_created": review.get("timestamp_created"),
+        "timestamp_updated": review.get("timestamp_updated"),
+        "voted_up": review.get("voted_up"),
+        "votes_up": review.get("votes_up"),
+        "votes_funny": review.get("votes_funny"),
+        "weighted_vote_score": float(review.get("weighted_vote_score") or 0),
+        "comment_count": review.get("comment_count"),
+        "steam_purchase": review.get("steam_purchase"),
+        "received_for_free": review.get("received_for_free"),
+        "written_during_early_access": review.get("written_during_early_access"),
+        "playtime_at_review": author.get("playtime_at_review"),
+        "playtime_forever": author.get("playtime_forever"),
+        "num_games_owned": author.get("num_games_owned"),
+        "num_reviews": author.get("num_reviews"),
+    }
+
+
+class ReviewsWriter:
+    """
+    Stream review rows to a Parquet file (one row group per chunk) or, for
+    other extensions or without pyarrow, to a gzipped TSV.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.rows = 0
+        self._parquet = None
+        self._tsv = None
+        if filename.endswith(".parquet"):
+            if pa is None:
+                raise ImportError("pyarrow is needed to write Parquet files.")
+            self._schema = pa.Schema.from_pandas(
+                pd.DataFrame(columns=list(REVIEW_COLUMNS)).astype(REVIEW_COLUMNS),
+                preserve_index=False,
+            )
+            self._to_table = pa.Table.from_pandas
+        else:
+            self._tsv = TsvWriter(filename, columns=list(REVIEW_COLUMNS))
+
+    def write(self, rows: list[dict]):
+        if not rows:
+            return
+        df = pd.DataFrame(rows, columns=list(REVIEW_COLUMNS)).astype(REVIEW_COLUMNS)
+        if self._tsv is not None:
+            self._tsv.write(df)
+        else:
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(
+                    self.filename, self._schema, compression="zstd"
+                )
+            self._parquet.write_table(
+                self._to_table(df, schema=self._schema, preserve_index=False)
+            )
+        self.rows += len(df)
+
+    def close(self):
+        if self._tsv is not None:
+            self._tsv.close()
+        elif self._parquet is not None:
+            self._parquet.close()
+
+
+class ReviewsHarvester:
+    """
+    Page through the reviews of many appids concurrently.
+
+    The state file keeps, for each appid, the `timestamp_updated` watermark of
+    its last complete harvest, so the next one stops at the first page holding
+    reviews already seen. An interrupted harvest also keeps the cursor of its
+    next page and resumes from there. Cursors are saved only once the reviews
+    before them are written.
+    """
+
+    def __init__(
+        self, s, writer: ReviewsWriter, state_path: str, max_pages: int | None = None
+    ):
+        self.s = s
+        self.writer = writer
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.max_pages = max_pages
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+
+    def _page_done(self, appid: str, rows: list[dict], **progress):
+        with self._lock:
+            self._buffer += rows
+            self.state.setdefault(appid, {}).update(progress)
+            if len(self._buffer) >= FLUSH_ROWS:
+                self.flush()
+
+    def flush(self):
+        self.writer.write(self._buffer)
+        self._buffer = []
+        save_state(self.state_path, self.state)
+
+    def harvest_app(self, appid: str) -> int:
+        """Harvest the new reviews of appid and return how many were found."""
+        with self._lock:
+            app_state = dict(self.state.get(appid, {}))
+        watermark = app_state.get("watermark", 0)
+        # Highest timestamp seen by this harvest, the watermark once it is over
+        newest = app_state.get("newest") or watermark
+        cursor = app_state.get("cursor") or "*"
+        if cursor != "*":
+            logger.debug("Resuming reviews of %s from cursor %s", appid, cursor)
+        count = 0
+        pages = 0
+        while True:
+            page = get_reviews_page(self.s, appid, cursor)
+            if not page.get("success"):
+                # Keep the cursor in the state to retry this page next time
+                raise RuntimeError(f"No reviews page returned for cursor {cursor}")
+            reviews = page.get("reviews") or []
+            new = [x for x in reviews if x.get("timestamp_updated", 0) > watermark]
+            newest = max([newest, *(x["timestamp_updated"] for x in new)])
+            count += len(new)
+            pages += 1
+            next_cursor = page.get("cursor")
+            finished = (
+                len(new) < len(reviews)
+                or len(reviews) < REVIEWS_PER_PAGE
+                or not next_cursor
+                or next_cursor == cursor
+            )
+            rows = [review_row(appid, review) for review in new]
+            if finished:
+                self._page_done(appid, rows, watermark=newest, newest=None, cursor=None)
+                return count
+            self._page_done(appid, rows, newest=newest, cursor=next_cursor)
+            if self.max_pages and pages >= self.max_pages:
+                logger.info("Stopping reviews of %s after %d pages", appid, pages)
+                return count
+            cursor = next_cursor
+
+    def run(self, appids, workers: int = 10):
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                future_to_appid = {
+                    executor.submit(self.harvest_app, str(appid)): appid
+                    for appid in appids
+                }
+                for future in as_completed(future_to_appid):
+                    appid = future_to_appid[future]
+                    try:
+                        logger.debug("%d new reviews for %s", future.result(), appid)
+                    except Exception as e:
+                        logger.error("Error harvesting reviews of %s: %s", appid, e)
+        finally:
+            with self._lock:
+                self.flush()
+            self.writer.close()
+        logger.info(
+            "Harvested %d reviews to %s", self.writer.rows, self.writer.filename
+        )
@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 60 * 60  # 1 hour
+MAX_INTERVAL = 30 * 24 * 60 * 60  # 30 days
+# Weight of the previous volatility in the moving average.
+DECAY = 0.7
+# A price change counts as much as this many new reviews per day.
+PRICE_CHANGE_WEIGHT = 50
+# New games are refreshed daily until their volatility is known.
+INITIAL_VOLATILITY = MAX_INTERVAL / (24 * 60 * 60) - 1
+# Games never fetched rank like games overdue by this many refresh intervals,
+# so long overdue games still get their turn.
+NEW_GAME_PRIORITY = 10
+# Appids that can't be fetched (removed or unknown apps) are retried after
+# this delay, doubled at each new failure up to MAX_INTERVAL.
+FAILURE_INTERVAL = 24 * 60 * 60  # 1 day
+
+
+def load_state(path: str) -> dict[str, dict]:
+    """Load per-appid volatility stats saved by a previous run."""
+    if not Path(path).is_file():
+        logger.info("No scheduler state found at %s, starting fresh", path)
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_state(path: str, state: dict[str, dict]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def refresh_interval(volatility: float) -> float:
+    """Seconds to wait before refreshing a game with the given volatility."""
+    return min(MAX_INTERVAL, max(MIN_INTERVAL, MAX_INTERVAL / (1 + volatility)))
+
+
+def failure_interval(failures: int) -> float:
+    """Seconds to wait before retrying an appid after failures in a row."""
+    return min(MAX_INTERVAL, FAILURE_INTERVAL * 2 ** (failures - 1))
+
+
+def select_due_appids(ids, state, budget: int, now: float | None = None) -> list:
+    """
+    Return the appids to refresh in this run, most overdue first.
+
+    Games never fetched before are always due, with the priority of a game
+    NEW_GAME_PRIORITY intervals overdue. A game is due when the time since its
+    last attempt exceeds its refresh interval, or its failure backoff if it
+    couldn't be fetched, and at most `budget` games are returned.
+    """
+    now = time.time() if now is None else now
+    priorities = []
+    for appid in ids:
+        stats = state.get(str(appid))
+        if stats is None:
+            priority = NEW_GAME_PRIORITY
+        elif stats.get("failures"):
+            elapsed = now - stats["last_attempt"]
+            priority = elapsed / failure_interval(stats["failures"])
+        else:
+            elapsed = now - stats["last_fetched"]
+            priority = elapsed / refresh_interval(stats["volatility"])
+        if priority >= 1:
+            priorities.append((priority, appid))
+    priorities.sort(key=lambda x: x[0], reverse=True)
+    selected = [appid for _, appid in priorities[:budget]]
+    logger.info(
+        "Scheduler: %d of %d games due, refreshing %d (budget %d)",
+        len(priorities),
+        len(ids),
+        len(selected),
+        budget,
+    )
+    return selected
+
+
+def update_state(state, game_dicts, now: float | None = None):
+    """Update volatility stats from the review counts and prices just fetched."""
+    now = time.time() if now is None else now
+    for game_dict in game_dicts:
+        appid = str(game_dict["appid"])
+        num_reviews = game_dict.get("num_reviews") or 0
+        price = game_dict.get("current_price_price")
+        previous = state.get(appid)
+        # Appids that only failed so far have no stats to compare with
+        if previous is None or "volatility" not in previous:
+            volatility = INITIAL_VOLATILITY
+        else:
+            elapsed_days = max(now - previous["last_fetched"], 1) / 86400
+            review_rate = abs(num_reviews - previous["num_reviews"]) / elapsed_days
+            price_changed = (
+                price is not None
+                and previous["price"] is not None
+                and price != previous["price"]
+            )
+            observed = review_rate + PRICE_CHANGE_WEIGHT * price_changed
+            volatility = DECAY * previous["volatility"] + (1 - DECAY) * observed
+        state[appid] = {
+            "last_fetched": now,
+            "num_reviews": num_reviews,
+            "price": price,
+            "volatility": volatility,
+        }
+    return state
+
+
+def record_failures(state, appids, now: float | None = None):
+    """
+    Back off the appids attempted in this run without a game to show for it.
+    The stats of their last successful fetch, if any, are kept for the next.
+    """
+    now = time.time() if now is None else now
+    for appid in appids:
+        previous = state.get(str(appid), {})
+        state[str(appid)] = {
+            **previous,
+            "last_attempt": now,
+            "failures": previous.get("failures", 0) + 1,
+        }
+    return state
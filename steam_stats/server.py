@@ -0,0 +1,192 @@
+import json
+import logging
+import signal
+import threading
+import time
+import urllib.parse
+from typing import Any
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .dataset import DatasetStore
+
+logger = logging.getLogger(__name__)
+
+
+class Daemon:
+    """
+    Run refresh cycles on an internal schedule and expose their status over HTTP.
+
+    The session, config and connection pools live as long as the process, so
+    interpreter start-up and TLS handshakes are paid once instead of every run.
+    """
+
+    def __init__(
+        self,
+        run_cycle,
+        interval: int,
+        host: str,
+        port: int,
+        store: DatasetStore | None = None,
+    ):
+        self.run_cycle = run_cycle
+        self.store = store
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.stats: dict[str, Any] = {
+            "started_at": time.time(),
+            "cycles": 0,
+            "failed_cycles": 0,
+            "running": False,
+            "last_cycle_started_at": None,
+            "last_cycle_duration": None,
+            "last_export": None,
+            "last_error": None,
+            "next_cycle_at": None,
+        }
+
+    def status(self) -> dict:
+        with self._lock:
+            return dict(self.stats, uptime=time.time() - self.stats["started_at"])
+
+    def metrics(self) -> str:
+        status = self.status()
+        lines = [
+            f"steam_stats_uptime_seconds {status['uptime']:.0f}",
+            f"steam_stats_cycles_total {status['cycles']}",
+            f"steam_stats_failed_cycles_total {status['failed_cycles']}",
+            f"steam_stats_cycle_running {int(status['running'])}",
+        ]
+        if status["last_cycle_duration"] is not None:
+            lines.append(
+                f"steam_stats_last_cycle_duration_seconds {status['last_cycle_duration']:.2f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def _cycle(self):
+        started_at = time.time()
+        with self._lock:
+            self.stats.update(running=True, last_cycle_started_at=started_at)
+        try:
+            # The cycle stops between two batches once the daemon is stopped.
+            export = self.run_cycle(self._stop)
+            if self.store is not None:
+                self.store.load(export)
+        except Exception as e:
+            logger.exception("Refresh cycle failed")
+            with self._lock:
+                self.stats["failed_cycles"] += 1
+                self.stats["last_error"] = str(e)
+        else:
+            with self._lock:
+                self.stats.update(last_export=export, last_error=None)
+        finally:
+            with self._lock:
+                self.stats["cycles"] += 1
+                self.stats["running"] = False
+                self.stats["last_cycle_duration"] = time.time() - started_at
+
+    def stop(self, *_):
+        logger.info("Stopping daemon after the current batch")
+        self._stop.set()
+
+    def run(self):
+        server = ThreadingHTTPServer(
+            (self.host, self.port), make_handler(self, self.store)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info("Status endpoint listening on http://%s:%s", self.host, self.port)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        try:
+            while not self._stop.is_set():
+                started_at = time.time()
+                self._cycle()
+                next_cycle_at = started_at + self.interval
+                with self._lock:
+                    self.stats["next_cycle_at"] = next_cycle_at
+                self._stop.wait(max(0, next_cycle_at - time.time()))
+        finally:
+            server.shutdown()
+
+
+def serve_api(store: DatasetStore, host: str, port: int):
+    """Serve the read API over the dataset in store until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(None, store))
+    logger.info("Read API listening on http://%s:%s", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+QUERY_PARAMS = {
+    "developer": str,
+    "publisher": str,
+    "genre": str,
+    "platform": str,
+    "min_review_percent": float,
+    "limit": int,
+}
+
+
+def make_handler(daemon: Daemon | None, store: DatasetStore | None):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            if daemon is not None and url.path == "/status":
+                self._send_json(200, daemon.status())
+            elif daemon is not None and url.path == "/metrics":
+                self._send(200, "text/plain; version=0.0.4", daemon.metrics())
+            elif store is not None and url.path.startswith("/games"):
+                self._games(store, url)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _games(self, store: DatasetStore, url):
+            dataset = store.get()
+            if dataset is None:
+                self._send_json(503, {"error": "no export loaded yet"})
+                return
+            appid = url.path.removeprefix("/games").strip("/")
+            if appid:
+                game = dataset.get(appid)
+                if game is None:
+                    self._send_json(404, {"error": f"appid {appid} not found"})
+                else:
+                    self._send_json(200, game)
+                return
+            filters: dict[str, Any] = {}
+            for key, value in urllib.parse.parse_qsl(url.query):
+                if key not in QUERY_PARAMS:
+                    self._send_json(400, {"error": f"unknown parameter {key}"})
+                    return
+                try:
+                    filters[key] = QUERY_PARAMS[key](value)
+                except ValueError:
+                    self._send_json(400, {"error": f"invalid value for {key}"})
+                    return
+            games = dataset.query(**filters)
+            self._send_json(
+                200, {"source": dataset.source, "count": len(games), "games": games}
+            )
+
+        def _send_json(self, code: int, body):
+            self._send(code, "application/json", json.dumps(body))
+
+        def _send(self, code: int, content_type: str, body: str):
+            payload = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
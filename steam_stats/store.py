@@ -0,0 +1,64 @@
+import json
+import logging
+import urllib.parse
+from .profiling import span
+from .requests import http_get
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_REQUEST = {
+    "include_release": True,
+    "include_platforms": True,
+    "include_basic_info": True,
+    "include_tag_count": 20,
+    "include_reviews": True,
+}
+# Prices are part of every store item, no extra data is needed to get them.
+PRICE_DATA_REQUEST: dict[str, bool] = {}
+
+
+def get_games_batch(
+    s,
+    appids: list[str],
+    country_code: str = "US",
+    data_request: dict | None = None,
+) -> dict[str, dict]:
+    """
+    Fetch game details for multiple games using IStoreBrowseService/GetItems API.
+    Returns a dict mapping appid -> game data.
+
+    Prices in the store items are the ones of country_code.
+
+    Note: Only requests essential fields to keep URL length manageable.
+    """
+    request_json = {
+        "ids": [{"appid": int(appid)} for appid in appids],
+        "context": {
+            "language": "english",
+            "country_code": country_code,
+            "steam_realm": 1,
+        },
+        "data_request": DEFAULT_DATA_REQUEST if data_request is None else data_request,
+    }
+
+    encoded_json_string = urllib.parse.quote(json.dumps(request_json))
+    url = f"https://api.steampowered.com/IStoreBrowseService/GetItems/v1?input_json={encoded_json_string}"
+
+    try:
+        result = http_get(s, url)
+        result.raise_for_status()
+        with span("json_decode"):
+            data = result.json()
+
+        # Build a dict mapping appid -> store_item
+        games_dict = {}
+        if "response" in data and "store_items" in data["response"]:
+            for store_item in data["response"]["store_items"]:
+                appid = str(store_item.get("appid", ""))
+                if appid:
+                    games_dict[appid] = store_item
+
+        return games_dict
+    except Exception as e:
+        logger.error("Error fetching batch of games: %s", e)
+        return {}
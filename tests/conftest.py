@@ -0,0 +1,209 @@
+import gzip
+import json
+import random
+import urllib.parse
+from pathlib import Path
+import pytest
+from steam_stats.recorder import redact
+
+TAGS = ["Action", "Indie", "RPG", "Strategy", "Simulation", "Adventure", "Casual"]
+# Archive in the format of steam_stats --record, used unless --bench-archive
+RECORDED_ARCHIVE = Path(__file__).parent / "fixtures" / "recorded.jsonl.gz"
+# Slowdown of the fastest round failing a comparison with a saved run
+COMPARE_FAIL = "min:20%"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("steam_stats benchmarks")
+    group.addoption(
+        "--bench-archive",
+        help=(
+            "Benchmark the recorded payloads of this archive, written by "
+            "steam_stats --record, instead of the one in tests/fixtures"
+        ),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Comparing with a saved run (--benchmark-compare) fails on a regression
+    # unless another threshold is given.
+    if getattr(config.option, "benchmark_compare", None) and not getattr(
+        config.option, "benchmark_compare_fail", None
+    ):
+        from pytest_benchmark.utils import parse_compare_fail
+
+        config.option.benchmark_compare_fail = [parse_compare_fail(COMPARE_FAIL)]
+
+
+def query_of(url: str) -> dict:
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+
+
+class SyntheticPayloads:
+    """Generate Steam and ITAD answers of realistic size, the same at each run."""
+
+    def __init__(self, batch_size: int, seed: int = 0):
+        self.random = random.Random(seed)
+        appids = [str(appid) for appid in range(10, 10 * (batch_size + 1), 10)]
+        self.store_items = [self.store_item(int(appid)) for appid in appids]
+        self.achievements = [(appid, self.achievements_of(appid)) for appid in appids]
+        self.itad_appids = appids
+
+    def store_item(self, appid: int) -> dict:
+        r = self.random
+        return {
+            "item_type": 0,
+            "id": appid,
+            "success": 1,
+            "visible": True,
+            "name": f"Game {appid} " + "x" * r.randint(0, 30),
+            "store_url_path": f"app/{appid}/Game_{appid}/",
+            "appid": appid,
+            "type": r.choice([0, 0, 0, 1, 2]),
+            "is_free": r.random() < 0.1,
+            "basic_info": {
+                "short_description": "Lorem ipsum dolor sit amet. " * 8,
+                "publishers": [{"name": f"Publisher {r.randint(1, 500)}"}],
+                "developers": [
+                    {"name": f"Developer {r.randint(1, 2000)}"}
+                    for _ in range(r.randint(1, 3))
+                ],
+                "content_rating": {"required_age": r.choice([0, 0, 16, 18])},
+            },
+            "tags": [
+                {
+                    "tagid": r.randint(1, 20000),
+                    "weight": r.randint(1, 5000),
+                    "name": tag,
+                }
+                for tag in r.sample(TAGS, r.randint(1, len(TAGS)))
+            ],
+            "reviews": {
+                "summary_filtered": {
+                    "review_count": r.randint(0, 100000),
+                    "percent_positive": r.randint(0, 100),
+                    "review_score": r.randint(1, 9),
+                    "review_score_label": "Very Positive",
+                }
+            },
+            "release": {"steam_release_date": r.randint(1_100_000_000, 1_750_000_000)},
+            "platforms": {
+                "windows": True,
+                "mac": r.random() < 0.3,
+                "steamos_linux": r.random() < 0.2,
+                "vr_support": {},
+            },
+        }
+
+    def achievements_of(self, appid) -> dict:
+        r = self.random
+        if r.random() < 0.2:
+            return {
+                "playerstats": {"error": "Requested app has no stats", "success": False}
+            }
+        return {
+            "playerstats": {
+                "steamID": "76561197960287930",
+                "gameName": f"Game {appid}",
+                "achievements": [
+                    {
+                        "apiname": f"ACHIEVEMENT_{i}",
+                        "achieved": int(r.random() < 0.4),
+                        "unlocktime": r.randint(0, 1_750_000_000),
+                    }
+                    for i in range(r.randint(5, 80))
+                ],
+                "success": True,
+            }
+        }
+
+    def itad_answer(self, url: str) -> dict:
+        """Answer the plain, lowest and prices requests of get_itad_data."""
+        r = self.random
+        query = query_of(url)
+        meta = {
+            "region": query.get("region"),
+            "country": query.get("country"),
+            "currency": "EUR",
+        }
+        if "/game/plain/" in url:
+            appid = query["game_id"].removeprefix("app/")
+            return {
+                ".meta": {"match": "id", "active": True},
+                "data": {"plain": f"plain{appid}"},
+            }
+        plain = query["plains"]
+        if "/game/lowest/" in url:
+            return {
+                ".meta": meta,
+                "data": {
+                    plain: {
+                        "shop": {"id": "steam", "name": "Steam"},
+                        "price": round(r.uniform(0, 60), 2),
+                        "cut": r.randint(0, 90),
+                        "added": r.randint(1_300_000_000, 1_750_000_000),
+                        "urls": {
+                            "history": f"https://isthereanydeal.com/game/{plain}/"
+                        },
+                    }
+                },
+            }
+        return {
+            ".meta": meta,
+            "data": {
+                plain: {
+                    "list": [
+                        {
+                            "price_new": round(r.uniform(0, 60), 2),
+                            "price_old": 59.99,
+                            "price_cut": r.randint(0, 90),
+                            "url": f"https://store.steampowered.com/app/{appid}/",
+                            "shop": {"id": "steam", "name": "Steam"},
+                            "drm": ["steam"],
+                        }
+                        for appid in [plain.removeprefix("plain"), r.randint(1, 10**6)]
+                    ],
+                    "urls": {"game": f"https://isthereanydeal.com/game/{plain}/"},
+                }
+            },
+        }
+
+
+class RecordedPayloads:
+    """The store items, achievements and ITAD answers of a --record archive."""
+
+    def __init__(self, archive: str):
+        self.store_items = []
+        self.achievements = []
+        self.itad_appids = []
+        self.itad_answers = {}
+        with gzip.open(archive, "rt", encoding="utf-8") as f:
+            for line in f:
+                exchange = json.loads(line)
+                url = exchange["url"]
+                if exchange["status"] != 200 or not exchange["body"]:
+                    continue
+                body = json.loads(exchange["body"])
+                if "IStoreBrowseService/GetItems" in url:
+                    self.store_items += body["response"].get("store_items", [])
+                elif "GetPlayerAchievements" in url:
+                    self.achievements.append((query_of(url)["appid"], body))
+                elif "api.isthereanydeal.com" in url:
+                    self.itad_answers[url] = body
+                    if "/v02/game/plain/" in url:
+                        appid = query_of(url)["game_id"].removeprefix("app/")
+                        self.itad_appids.append(appid)
+
+    def itad_answer(self, url: str):
+        # Recorded URLs are redacted, their key included
+        return self.itad_answers.get(redact(url.format(key="")))
+
+
+@pytest.fixture(scope="session", params=["recorded", "batch-200", "batch-10000"])
+def payloads(request):
+    """Recorded payloads, a synthetic batch and a large synthetic run."""
+    if request.param == "recorded":
+        archive = request.config.getoption("--bench-archive") or RECORDED_ARCHIVE
+        return RecordedPayloads(str(archive))
+    return SyntheticPayloads(int(request.param.removeprefix("batch-")))
@@ -0,0 +1,81 @@
+"""
+Throughput and allocations of the parsing of Steam and ITAD answers, per
+batch of games. Network, key pools and request deduplication are left out:
+each benchmark feeds the parsing code with payloads already decoded.
+"""
+
+import tracemalloc
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import steam_stats.itad
+from steam_stats.__main__ import (
+    extract_game_data_from_store_item,
+    parse_achievements,
+)
+from steam_stats.itad import get_itad_data
+
+# Many warmed-up rounds without GC pauses, so the fastest round is steady
+# enough to compare runs.
+pytestmark = pytest.mark.benchmark(min_rounds=20, warmup=True, disable_gc=True)
+
+
+def peak_bytes_per_item(run, items: int) -> float:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / items
+
+
+def run_benchmark(benchmark, run, items: int):
+    if not items:
+        pytest.skip("No payloads found for this benchmark")
+    benchmark.extra_info["items"] = items
+    benchmark.extra_info["peak_bytes_per_item"] = peak_bytes_per_item(run, items)
+    benchmark(run)
+
+
+def test_extract(benchmark, payloads):
+    def run():
+        return [
+            extract_game_data_from_store_item(item) for item in payloads.store_items
+        ]
+
+    run_benchmark(benchmark, run, len(payloads.store_items))
+
+
+def test_achievements(benchmark, payloads):
+    def run():
+        return [
+            parse_achievements(appid, result) for appid, result in payloads.achievements
+        ]
+
+    run_benchmark(benchmark, run, len(payloads.achievements))
+
+
+class CannedJson:
+    """Stand in for get_json, answering each URL once and then from memory."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.answers = {}
+
+    def __call__(self, s, url, keys=None):
+        if url not in self.answers:
+            self.answers[url] = self.answer(url)
+        return self.answers[url]
+
+
+def test_itad(benchmark, payloads, monkeypatch):
+    monkeypatch.setattr(steam_stats.itad, "get_json", CannedJson(payloads.itad_answer))
+
+    def run():
+        return [get_itad_data(None, None, appid) for appid in payloads.itad_appids]
+
+    # Fill the answers before measuring, so only the shaping of them is timed
+    run()
+    run_benchmark(benchmark, run, len(payloads.itad_appids))
@@ -0,0 +1,54 @@
+from steam_stats.scheduler import (
+    FAILURE_INTERVAL,
+    MAX_INTERVAL,
+    record_failures,
+    select_due_appids,
+    update_state,
+)
+
+DAY = 24 * 60 * 60
+NOW = 1_700_000_000
+
+
+def test_new_games_are_due():
+    assert select_due_appids(["1", "2"], {}, budget=10, now=NOW) == ["1", "2"]
+
+
+def test_stale_game_not_fetched_is_due():
+    state = update_state({}, [{"appid": "1", "num_reviews": 10}], now=NOW)
+    assert select_due_appids(["1"], state, budget=10, now=NOW + DAY / 2) == []
+    assert select_due_appids(["1"], state, budget=10, now=NOW + 2 * DAY) == ["1"]
+
+
+def test_failed_appids_back_off():
+    state = record_failures({}, ["999"], now=NOW)
+    assert select_due_appids(["999"], state, budget=10, now=NOW + 1) == []
+    due = NOW + FAILURE_INTERVAL
+    assert select_due_appids(["999"], state, budget=10, now=due) == ["999"]
+
+    record_failures(state, ["999"], now=due)
+    assert state["999"]["failures"] == 2
+    assert select_due_appids(["999"], state, budget=10, now=due + DAY) == []
+    assert select_due_appids(["999"], state, budget=10, now=due + 2 * DAY) == ["999"]
+
+
+def test_dead_appids_dont_starve_overdue_games():
+    state = update_state({}, [{"appid": "1", "num_reviews": 10}], now=NOW)
+    later = NOW + 3 * 365 * DAY
+    record_failures(state, ["999", "998"], now=later - DAY / 2)
+    assert select_due_appids(["999", "998", "1"], state, budget=1, now=later) == ["1"]
+
+
+def test_long_overdue_games_outrank_new_ones():
+    state = update_state({}, [{"appid": "1", "num_reviews": 10}], now=NOW)
+    later = NOW + 20 * MAX_INTERVAL
+    assert select_due_appids(["2", "1"], state, budget=1, now=later) == ["1"]
+
+
+def test_success_after_failures_resets_backoff():
+    state = update_state({}, [{"appid": "1", "num_reviews": 10}], now=NOW)
+    record_failures(state, ["1"], now=NOW + DAY)
+    assert state["1"]["num_reviews"] == 10
+    update_state(state, [{"appid": "1", "num_reviews": 20}], now=NOW + 2 * DAY)
+    assert "failures" not in state["1"]
+    assert state["1"]["last_fetched"] == NOW + 2 * DAY